@@ -0,0 +1,68 @@
+"""Module that finds the earliest aerial intercept by checking all the ball prediction slices at once"""
+from collections import namedtuple
+
+import numpy as np
+
+# Constants of the RLUtilities Aerial
+boost_acceleration = 1060
+boost_per_second = 30
+gravity = np.array([0, 0, -650])
+jump_speed = 291.667
+jump_acceleration = 1458.333
+jump_duration = 0.2
+angle_threshold = 0.3
+# Like Aerial.is_viable the plan keeps some boost and acceleration in reserve
+max_boost_fraction = 0.95
+max_acceleration_ratio = 0.9
+# Balls lower than this are left to the ground play and the jump shots
+min_aerial_height = 300
+max_aerial_time = 4
+# The car aims this far behind the ball as seen from the goal it shoots at
+target_offset = 120
+# Slices are checked in chunks from the earliest one on and at most max_chunks chunks are checked per call, which
+# covers the max aerial time of the 60 fps ball prediction and bounds the work of a tick the same on every machine
+chunk_size = 30
+max_chunks = 8
+
+AerialPlan = namedtuple('AerialPlan', ['index', 'time', 'target', 'boost_estimate'])
+
+
+def aerial_constraints(position, velocity, forward, up, boost, targets, times):
+    """Returns the boost needed and whether the aerial is viable for every target at its time, estimated like
+    Aerial.is_viable does: jump, reorient towards the target while falling and boost the rest of the way.
+    position, velocity, forward and up are the numpy versions of a car on the ground"""
+    t = times[:, None]
+    # Where the car ends up after the jump without boosting
+    end = position + velocity * t + 0.5 * gravity * t ** 2
+    end = end + up * (jump_speed * t + jump_acceleration * jump_duration * (t - 0.5 * jump_duration))
+    delta = targets - end
+    distance = np.linalg.norm(delta, axis=1)
+    direction = delta / np.maximum(distance, 1e-10)[:, None]
+    phi = np.arccos(np.clip(direction @ forward, -1, 1))
+    # Time to reorient, the car can start boosting once it points within the angle threshold
+    turn_time = 0.7 * 2 * np.sqrt(phi / 9)
+    reorient_time = turn_time * np.clip(1 - angle_threshold / np.maximum(phi, 1e-10), 0, 1)
+    boost_time = np.maximum(times - reorient_time, 1e-10)
+    ratio = 2 * distance / boost_time ** 2 / boost_acceleration
+    boost_end = times - boost_time * np.sqrt(1 - np.clip(ratio, 0, 1))
+    boost_needed = (boost_end - reorient_time) * boost_per_second
+    viable = (times > reorient_time) & (ratio < max_acceleration_ratio) & (boost_needed < max_boost_fraction * boost)
+    return boost_needed, viable
+
+
+def aerial_intercept(position, velocity, forward, up, boost, ball_locations, times, goal, chunks=max_chunks):
+    """Returns the plan of the earliest viable aerial that hits the ball towards the goal, or None.
+    ball_locations and times are the ball prediction, the slices are checked in chunks from the earliest one and
+    slices past the first chunks are left out"""
+    candidates = np.flatnonzero((ball_locations[:, 2] >= min_aerial_height) & (times > 0) &
+                                (times <= max_aerial_time))[:chunks * chunk_size]
+    for chunk_start in range(0, len(candidates), chunk_size):
+        chunk = candidates[chunk_start:chunk_start + chunk_size]
+        balls = ball_locations[chunk].astype(float)
+        goal_to_ball = balls - goal
+        targets = balls + target_offset * goal_to_ball / np.linalg.norm(goal_to_ball, axis=1)[:, None]
+        boost_needed, viable = aerial_constraints(position, velocity, forward, up, boost, targets, times[chunk])
+        if viable.any():
+            first = viable.argmax()
+            return AerialPlan(chunk[first], times[chunk[first]], targets[first], boost_needed[first])
+    return None
@@ -0,0 +1,258 @@
+"""Module that reads the ball prediction once per tick into numpy arrays"""
+from collections import namedtuple, Counter
+
+import numpy as np
+
+from rlutilities.linear_algebra import vec3
+
+# Layout of a ball prediction slice in the RLBot struct
+slice_dtype = np.dtype([('physics', [('location', '<f4', 3),
+                                     ('rotation', [('pitch', '<f4'), ('yaw', '<f4'), ('roll', '<f4')]),
+                                     ('velocity', '<f4', 3), ('angular_velocity', '<f4', 3)]),
+                        ('game_seconds', '<f4')])
+# Ball prediction slices per second
+fps = 60
+
+
+class BallPrediction:
+    """Class that holds the ball prediction of the current tick as numpy arrays"""
+
+    def __init__(self, slices, time):
+        self.slices = slices
+        self.time = time
+        self.num_slices = len(slices)
+        physics = slices['physics']
+        self.position = physics['location']
+        self.velocity = physics['velocity']
+        self.angular_velocity = physics['angular_velocity']
+        self.game_seconds = slices['game_seconds']
+        # Derived columns
+        self.time_until = self.game_seconds - time
+        self.height = self.position[:, 2]
+        self.velocity_2d = np.linalg.norm(self.velocity[:, :2], axis=1)
+        self._trajectory = None
+
+    @classmethod
+    def from_struct(cls, ball_prediction, time):
+        """Views the ctypes ball prediction struct as numpy arrays without copying it"""
+        if ball_prediction is None or ball_prediction.num_slices == 0:
+            return cls(np.zeros(0, slice_dtype), time)
+        slices = np.ctypeslib.as_array(ball_prediction.slices).view(slice_dtype)[:ball_prediction.num_slices]
+        return cls(slices, time)
+
+    @classmethod
+    def from_arrays(cls, position, velocity, angular_velocity, game_seconds, time):
+        """Builds the ball prediction out of arrays with a row per slice"""
+        slices = np.zeros(len(game_seconds), slice_dtype)
+        slices['physics']['location'] = position
+        slices['physics']['velocity'] = velocity
+        slices['physics']['angular_velocity'] = angular_velocity
+        slices['game_seconds'] = game_seconds
+        return cls(slices, time)
+
+    def copy(self):
+        """Returns a copy that keeps its values, RLBot overwrites the memory of the struct every tick"""
+        return BallPrediction(self.slices.copy(), self.time)
+
+    def location(self, index):
+        """Returns the location of the ball at a slice as a vec3"""
+        position = self.position[index]
+        return vec3(float(position[0]), float(position[1]), float(position[2]))
+
+    @property
+    def trajectory(self):
+        """The ball at any time of the prediction as a BallTrajectory, built the first time it is used"""
+        if self._trajectory is None:
+            self._trajectory = BallTrajectory(self.time_until, self.position, self.velocity)
+        return self._trajectory
+
+
+class BallTrajectory:
+    """Class that gives the ball at any time of the ball prediction by Hermite interpolation between the slices, with
+    the velocities of the slices as the tangents. Times are in seconds from now and are clamped to the prediction"""
+
+    def __init__(self, times, position, velocity):
+        self.times = np.asarray(times, float)
+        self.position = np.asarray(position, float)
+        self.velocity = np.asarray(velocity, float)
+        # Every segment between two slices is the cubic ((a * s + b) * s + c) * s + d of the fraction s of the way
+        self.step = np.diff(self.times)
+        p0, p1 = self.position[:-1], self.position[1:]
+        m0, m1 = self.step[:, None] * self.velocity[:-1], self.step[:, None] * self.velocity[1:]
+        self.coefficients = np.stack((2 * p0 + m0 - 2 * p1 + m1, 3 * p1 - 3 * p0 - 2 * m0 - m1, m0, p0))
+
+    def segments(self, times):
+        """Returns the segment every time falls in and the fraction of the way through it"""
+        times = np.asarray(times, float)
+        index = np.clip(np.searchsorted(self.times, times, side='right') - 1, 0, len(self.step) - 1)
+        fraction = np.clip((times - self.times[index]) / self.step[index], 0, 1)
+        return index, fraction[..., None]
+
+    def position_at(self, times):
+        """Returns the location of the ball at every time, (n, 3) for n times and (3,) for a single time"""
+        if len(self.times) < 2:
+            return np.broadcast_to(self.position[0], np.shape(times) + (3,))
+        index, s = self.segments(times)
+        a, b, c, d = self.coefficients[:, index]
+        return ((a * s + b) * s + c) * s + d
+
+    def velocity_at(self, times):
+        """Returns the velocity of the ball at every time, the derivative of position_at"""
+        if len(self.times) < 2:
+            return np.broadcast_to(self.velocity[0], np.shape(times) + (3,))
+        index, s = self.segments(times)
+        a, b, c, _ = self.coefficients[:, index]
+        return ((3 * a * s + 2 * b) * s + c) / self.step[index][..., None]
+
+    def location_at(self, time):
+        """Returns the location of the ball at a single time as a vec3"""
+        position = self.position_at(time)
+        return vec3(float(position[0]), float(position[1]), float(position[2]))
+
+    def first_time_below(self, height):
+        """Returns the first time the ball is lower than the height, or None when it stays above it"""
+        return self.first_crossing(2, height, falling=True)
+
+    def first_crossing_y(self, y):
+        """Returns the first time the ball crosses the line y = y in either direction, or None when it doesn't"""
+        return self.first_crossing(1, y, falling=False)
+
+    def first_crossing(self, axis, level, falling):
+        """Returns the first time the coordinate of the ball on the axis crosses the level, only downwards when
+        falling. The slices find the segment and the cubic of that segment finds the time within it"""
+        if len(self.times) == 0:
+            return None
+        above = self.position[:, axis] > level
+        if falling and not above[0]:
+            return float(self.times[0])
+        crossed = np.flatnonzero(above[:-1] & ~above[1:] if falling else above[:-1] != above[1:])
+        if len(crossed) == 0:
+            return None
+        i = crossed[0]
+        a, b, c, d = self.coefficients[:, i, axis]
+        roots = np.roots([a, b, c, d - level])
+        roots = np.sort(roots[(np.abs(roots.imag) < 1e-9) & (roots.real >= 0) & (roots.real <= 1)].real)
+        # The cubic can miss the crossing when the ball bounces within the segment, then it is linear
+        s = roots[0] if len(roots) > 0 else (d - level) / (d - self.position[i + 1, axis])
+        return float(self.times[i] + s * self.step[i])
+
+
+BallEvents = namedtuple('BallEvents', ['bounce_indices', 'bounce_times', 'bounce_positions', 'conceding_index',
+                                       'airborne_intervals', 'bouncing'])
+# Slices above this height are in the air and get skipped when looking for bounces
+bouncing_height = 180
+# A bounce has to be below this height
+bounce_height = 125
+# The ball is on the ground below this height
+airborne_height = 120
+# Angular velocity directions with a smaller dot product than this have changed
+same_direction = 0.9999
+max_bounces = 16
+# The path of the ball changed when the prediction is further than this from where the previous one had the ball
+max_prediction_error = 10
+# Every this many slices of the prediction are compared with the previous one, a changed path stays changed after
+comparison_stride = 6
+# Events are searched again when the prediction reaches this many seconds past the slices they were searched on
+max_unsearched_time = 0.5
+
+
+def detect_events(ball_prediction, angular_velocity, own_goal_sign):
+    """Finds the bounces, the first slice in our own goal and the airborne intervals of the ball prediction at once.
+    angular_velocity is the current angular velocity of the ball and own_goal_sign the sign of the y of our goal"""
+    position = ball_prediction.position
+    time_until = ball_prediction.time_until
+    in_goal = np.flatnonzero(position[:, 1] * own_goal_sign > 5120)
+    conceding_index = in_goal[0] if len(in_goal) > 0 else None
+
+    # Bounces are low slices where the spin or the vertical direction of the ball changes compared to the previous low
+    # slice, slices in the air don't count as the previous one
+    low = np.flatnonzero(position[:, 2] <= bouncing_height)
+    spin = np.vstack((angular_velocity, ball_prediction.angular_velocity[low]))
+    length = np.linalg.norm(spin, axis=1)
+    spinning = length > 1e-10
+    direction = spin / np.maximum(length, 1e-10)[:, None]
+    turned = np.sum(direction[1:] * direction[:-1], axis=1) < same_direction
+    spin_changed = (spinning[1:] != spinning[:-1]) | (spinning[1:] & spinning[:-1] & turned)
+    vertical = ball_prediction.velocity[low, 2]
+    turned_up = np.concatenate(([False], (vertical[1:] > 0) & (vertical[:-1] <= 0)))
+    bounce_indices = low[(position[low, 2] < bounce_height) & (spin_changed | turned_up)][:max_bounces]
+
+    airborne = np.concatenate(([False], position[:, 2] > airborne_height, [False]))
+    edges = np.flatnonzero(airborne[1:] != airborne[:-1])
+    # Every interval is the time of its first slice in the air until the time of its first slice on the ground
+    starts, ends = edges[::2], edges[1::2]
+    end_times = np.append(time_until, time_until[-1] if len(time_until) > 0 else 0)[ends]
+    airborne_intervals = np.column_stack((time_until[starts], end_times))
+
+    return BallEvents(bounce_indices, time_until[bounce_indices], position[bounce_indices], conceding_index,
+                      airborne_intervals, bool(np.any(position[:, 2] > bouncing_height)))
+
+
+def advance_events(events, ball_prediction, shift, elapsed):
+    """Returns the events of a ball prediction that follows the same path as the prediction of the events, but starts
+    shift slices and elapsed seconds later. Events that are in the past now are dropped, the slices at the end of the
+    new prediction aren't searched for bounces"""
+    bounce_indices = np.round(events.bounce_indices - shift).astype(int)
+    kept = bounce_indices >= 0
+    conceding_index = events.conceding_index
+    if conceding_index is not None:
+        conceding_index = max(int(round(conceding_index - shift)), 0)
+    airborne_intervals = events.airborne_intervals - elapsed
+    airborne_intervals = airborne_intervals[airborne_intervals[:, 1] > 0]
+    airborne_intervals[:, 0] = np.maximum(airborne_intervals[:, 0], 0)
+    return BallEvents(bounce_indices[kept], events.bounce_times[kept] - elapsed, events.bounce_positions[kept],
+                      conceding_index, airborne_intervals,
+                      bool(np.any(ball_prediction.position[:, 2] > bouncing_height)))
+
+
+class PredictionTracker:
+    """Class that tells whether the events of the previous ball prediction can be advanced to the new one. They can when
+    nobody touched the ball, the new prediction follows the path of the previous one at the same game times and the
+    events were searched on most of the new prediction"""
+
+    def __init__(self):
+        self.previous = None
+        self.touch = None
+        self.searched_until = None
+        self.shift = 0
+        self.elapsed = 0
+        self.changes = Counter()
+
+    def update(self, ball_prediction, touch):
+        """Returns why the events have to be searched again, or None when they can be advanced by shift slices and
+        elapsed seconds"""
+        reason = self.change(ball_prediction, touch)
+        self.changes[reason or 'same'] += 1
+        self.previous = ball_prediction.copy()
+        self.touch = touch
+        if reason is not None and ball_prediction.num_slices > 0:
+            self.searched_until = float(ball_prediction.game_seconds[-1])
+        return reason
+
+    def change(self, ball_prediction, touch):
+        """Returns why the new prediction can't use the events of the stored one, or None when it can"""
+        previous = self.previous
+        if previous is None or previous.num_slices == 0 or ball_prediction.num_slices == 0:
+            return 'no prediction'
+        if touch != self.touch:
+            return 'touch'
+        game_seconds = ball_prediction.game_seconds
+        start, end = float(previous.game_seconds[0]), float(previous.game_seconds[-1])
+        if game_seconds[0] < start - 1e-6 or game_seconds[0] > end:
+            return 'time'
+        if game_seconds[-1] - self.searched_until > max_unsearched_time:
+            return 'horizon'
+        overlap = np.arange(0, np.searchsorted(game_seconds, end + 1e-6), comparison_stride)
+        for axis in range(3):
+            expected = np.interp(game_seconds[overlap], previous.game_seconds, previous.position[:, axis])
+            if np.abs(ball_prediction.position[overlap, axis] - expected).max() > max_prediction_error:
+                return 'path'
+        self.shift = (float(game_seconds[0]) - start) * fps
+        self.elapsed = ball_prediction.time - previous.time
+        return None
+
+    @property
+    def change_rate(self):
+        """Fraction of the ticks where the events were searched again"""
+        ticks = sum(self.changes.values())
+        return 1 - self.changes['same'] / ticks if ticks > 0 else 0.0
@@ -0,0 +1,145 @@
+"""Module that benchmarks the hot functions of the bot on the exercise scenarios without the game running"""
+import argparse
+import json
+import sys
+import tracemalloc
+from collections import namedtuple
+from pathlib import Path
+from random import Random
+from time import perf_counter
+
+import numpy as np
+
+from rlbottraining.rng import SeededRandomNumberGenerator
+
+from defending import defending_target
+from derevo import Hypebot
+from dribble import Dribbling
+from headless import make_field_info, make_packet, ball_from_packet, predict_ball, default_exercises, \
+    exercise_teams
+from jump_shot import jump_shot
+from replay import replay_agent_class
+from shooting import shooting_target
+from util import get_intersect
+
+baseline_path = Path(__file__).absolute().parent / 'benchmark_baseline.json'
+warmup_calls = 10
+# A run regresses when it is slower or allocates more than the baseline by the tolerance plus the slack
+time_slack = 2
+allocation_slack = 1024
+
+Result = namedtuple('Result', ['median_us', 'p95_us', 'peak_bytes'])
+
+
+def make_agent(exercise, seed):
+    """Returns a bot that has played the first tick of the game state of the exercise, the first car is the bot"""
+    game_state = exercise.make_game_state(SeededRandomNumberGenerator(Random(seed)))
+    teams = exercise_teams(exercise, game_state)
+    packet = make_packet(game_state, teams)
+    agent = replay_agent_class(Hypebot)(teams[0], 0, make_field_info())
+    agent.async_simulation = False
+    agent.render_profile = False
+    agent.initialize_agent()
+    agent.ball_prediction_struct = predict_ball(ball_from_packet(packet))
+    agent.get_output(packet)
+    return agent
+
+
+def hot_functions(agent):
+    """Returns the functions to benchmark as calls without arguments on the state of the agent"""
+    state = agent.jump_shot_state()
+    dribbling = Dribbling(agent.info.my_car, agent.info.ball, agent.their_goal)
+    return {
+        'simulate': agent.simulate,
+        'jump_shot': lambda: jump_shot(*state),
+        'predict': agent.predict,
+        'plan_aerial': agent.plan_aerial,
+        'get_intersect': lambda: get_intersect(agent, agent.index),
+        'shooting_target': lambda: shooting_target(agent),
+        'defending_target': lambda: defending_target(agent),
+        'Dribbling.step': dribbling.step,
+        'CustomDrive.step': lambda: agent.drive.step(1 / 120),
+    }
+
+
+def measure(function, calls):
+    """Returns the median and p95 latency in microseconds and the median peak of the memory allocated in a call"""
+    for _ in range(warmup_calls):
+        function()
+    times = np.empty(calls)
+    for i in range(calls):
+        start = perf_counter()
+        function()
+        times[i] = perf_counter() - start
+    # Tracing allocations slows every call down so it gets its own calls
+    peaks = np.empty(calls)
+    tracemalloc.start()
+    for i in range(calls):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        function()
+        peaks[i] = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    p50, p95 = np.percentile(times * 1e6, [50, 95])
+    return Result(float(p50), float(p95), float(np.median(peaks)))
+
+
+def run(calls=200, seed=0):
+    """Benchmarks every hot function on every exercise, returns the results keyed on function and exercise"""
+    results = {}
+    for exercise in default_exercises():
+        agent = make_agent(exercise, seed)
+        for name, function in hot_functions(agent).items():
+            results[f'{name} | {exercise.name}'] = measure(function, calls)
+        agent.shot_worker.shutdown()
+    return results
+
+
+def regressions(results, baseline, tolerance):
+    """Returns a line for every result that is slower or allocates more than its baseline"""
+    lines = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        base = Result(**baseline[key])
+        if result.median_us > base.median_us * (1 + tolerance) + time_slack:
+            lines.append(f'{key}: {result.median_us:.1f}us, baseline {base.median_us:.1f}us')
+        if result.peak_bytes > base.peak_bytes * (1 + tolerance) + allocation_slack:
+            lines.append(f'{key}: {result.peak_bytes / 1024:.1f}KiB, baseline {base.peak_bytes / 1024:.1f}KiB')
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=200, help='calls per function and exercise')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the exercise rng')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative regression')
+    parser.add_argument('--save', action='store_true', help='store this run as the baseline')
+    args = parser.parse_args()
+
+    results = run(args.calls, args.seed)
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+    print(f'{"function | exercise":<48} {"p50":>9} {"p95":>9} {"peak":>10} {"vs baseline":>12}')
+    for key, result in results.items():
+        change = f'{result.median_us / baseline[key]["median_us"] - 1:+.0%}' if key in baseline else 'new'
+        print(f'{key:<48} {result.median_us:7.1f}us {result.p95_us:7.1f}us {result.peak_bytes / 1024:7.1f}KiB '
+              f'{change:>12}')
+    if args.save:
+        baseline_path.write_text(json.dumps({key: result._asdict() for key, result in results.items()}, indent=2))
+        print(f'Saved the baseline to {baseline_path}')
+        return
+    if not baseline:
+        # Without a baseline nothing is checked, which must not pass as a run without regressions
+        print(f'\nNo baseline at {baseline_path}, store one with --save')
+        sys.exit(1)
+    failed = regressions(results, baseline, args.tolerance)
+    if failed:
+        print(f'\n{len(failed)} REGRESSIONS against the baseline:')
+        for line in failed:
+            print(f'  {line}')
+        sys.exit(1)
+    print('\nNo regressions against the baseline')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,41 @@
 """Module to keep track of all the boost pads."""
+from collections import namedtuple
+
+import numpy as np
+
 from rlutilities.linear_algebra import vec3
+from util import to_array
+
+# Time it takes for a picked up pad to become active again
+big_pad_respawn_time = 10
+small_pad_respawn_time = 4
+# Boost a pad gives
+big_pad_boost = 100
+small_pad_boost = 12
+# Speed at which routes are planned, the max throttle speed so routes are still on time without boost
+route_speed = 1410
+
+Route = namedtuple('Route', ['pads', 'time', 'boost'])
 
 
 class BoostPad:
     """Class to keep track of all the boost pads."""
 
-    def __init__(self, index, location, is_active, timer):
+    def __init__(self, index, location, is_full_boost, game_arrays):
         self.index = index
         self.location = location
-        self.is_active = is_active
-        self.timer = timer
+        self.is_full_boost = is_full_boost
+        self.game_arrays = game_arrays
+
+    @property
+    def is_active(self):
+        """Whether the pad can be picked up, read from the packet arrays"""
+        return bool(self.game_arrays.pad_active[self.index])
+
+    @property
+    def timer(self):
+        """Time since the pad was picked up, read from the packet arrays"""
+        return float(self.game_arrays.pad_timer[self.index])
 
 
 def init_boostpads(agent):
@@ -21,20 +47,103 @@ def init_boostpads(agent):
         current = field_info.boost_pads[i]
         if field_info.boost_pads[i].is_full_boost:
             agent.boost_pads.append(
-                BoostPad(i, vec3(current.location.x, current.location.y, current.location.z), True, 0.0))
+                BoostPad(i, vec3(current.location.x, current.location.y, current.location.z), True,
+                         agent.game_arrays))
         else:
             agent.small_boost_pads.append(
-                BoostPad(i, vec3(current.location.x, current.location.y, current.location.z), True, 0.0))
+                BoostPad(i, vec3(current.location.x, current.location.y, current.location.z), False,
+                         agent.game_arrays))
+    agent.boost_pad_index = BoostPadIndex(agent.boost_pads + agent.small_boost_pads, agent.game_arrays)
+    agent.boost_routes = BoostRoutes(agent.boost_pad_index)
+
+
+class BoostPadIndex:
+    """Class with the static locations of the boost pads that answers nearest pad queries on numpy arrays"""
+
+    def __init__(self, pads, game_arrays):
+        self.pads = pads
+        self.game_arrays = game_arrays
+        self.locations = np.array([to_array(pad.location) for pad in pads]).reshape(-1, 3)
+        self.field_indices = np.array([pad.index for pad in pads], int)
+        self.full_boost = np.array([pad.is_full_boost for pad in pads], bool)
+        self.respawn_time = np.where(self.full_boost, big_pad_respawn_time, small_pad_respawn_time)
+
+    def distances(self, locations):
+        """Returns the 2d distances from every location to every pad as a (locations, pads) array"""
+        locations = np.asarray(locations, float).reshape(-1, 3)
+        return np.linalg.norm(locations[:, None, :2] - self.locations[None, :, :2], axis=2)
+
+    def time_until_active(self):
+        """Returns the time until every pad is active again, which is 0 for active pads"""
+        active = self.game_arrays.pad_active[self.field_indices]
+        timer = self.game_arrays.pad_timer[self.field_indices]
+        return np.where(active, 0, np.maximum(self.respawn_time - timer, 0))
+
+    def candidate_distances(self, locations, full_boost=None, speed=None):
+        """Returns the distances to the pads with inf for the pads we don't want. With a speed, pads that are still
+        respawning when we arrive driving at that speed are left out, an infinite speed leaves out all inactive pads"""
+        distances = self.distances(locations)
+        if full_boost is not None:
+            distances[:, self.full_boost != full_boost] = np.inf
+        if speed is not None:
+            distances[distances / max(speed, 1) < self.time_until_active()] = np.inf
+        return distances
+
+    def k_nearest(self, locations, k=1, full_boost=None, speed=None):
+        """Returns the indices into pads of the k nearest pads for every location, -1 where there is no pad"""
+        distances = self.candidate_distances(locations, full_boost, speed)
+        k = min(k, distances.shape[1])
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        order = np.take_along_axis(distances, nearest, axis=1).argsort(axis=1)
+        nearest = np.take_along_axis(nearest, order, axis=1)
+        return np.where(np.isfinite(np.take_along_axis(distances, nearest, axis=1)), nearest, -1)
+
+    def within_radius(self, locations, radius, full_boost=None, speed=None):
+        """Returns a (locations, pads) boolean array of which pads are within the radius of every location"""
+        return self.candidate_distances(locations, full_boost, speed) <= radius
+
+    def closest(self, location, full_boost=None, speed=None):
+        """Returns the closest pad to a location or None"""
+        nearest = self.k_nearest(to_array(location), 1, full_boost, speed)[0, 0]
+        return self.pads[nearest] if nearest >= 0 else None
+
 
+class BoostRoutes:
+    """Class that plans routes over at most two boost pads to a target. The travel times between all pads are computed
+    once per match, the respawn timers of the packet decide which pads still have boost when we get there"""
 
-def update_boostpads(agent, packet):
-    """Method to update the boost pads."""
-    for i in range(0, len(agent.boost_pads)):
-        boost_pad = packet.game_boosts[agent.boost_pads[i].index]
-        agent.boost_pads[i].is_active = boost_pad.is_active
-        agent.boost_pads[i].timer = boost_pad.timer
+    def __init__(self, pad_index, speed=route_speed):
+        self.pad_index = pad_index
+        self.pads = pad_index.pads
+        self.speed = speed
+        self.travel_times = pad_index.distances(pad_index.locations) / speed
+        # A route doesn't visit the same pad twice in a row
+        np.fill_diagonal(self.travel_times, np.inf)
+        self.pad_boost = np.where(pad_index.full_boost, big_pad_boost, small_pad_boost)
 
-    for i in range(0, len(agent.small_boost_pads)):
-        boost_pad = packet.game_boosts[agent.small_boost_pads[i].index]
-        agent.small_boost_pads[i].is_active = boost_pad.is_active
-        agent.small_boost_pads[i].timer = boost_pad.timer
+    def best_route(self, start, target, boost, min_boost, deadline):
+        """Returns the fastest route from the start to the target that arrives before the deadline, in seconds from now,
+        with at least min_boost. The route has the pads to drive over in order, the arrival time and the boost we
+        arrive with, it is None when no route makes it"""
+        to_pads = self.pad_index.distances(start)[0] / self.speed
+        from_pads = self.pad_index.distances(target)[0] / self.speed
+        direct = np.linalg.norm(np.asarray(target, float)[:2] - np.asarray(start, float)[:2]) / self.speed
+        respawn = self.pad_index.time_until_active()
+        if boost >= min_boost and direct <= deadline:
+            return Route([], float(direct), boost)
+        # Boost after a single pad
+        one_boost = np.minimum(boost + np.where(respawn <= to_pads, self.pad_boost, 0), 100)
+        one_time = to_pads + from_pads
+        # Boost after every pair of pads, rows are the first pad and columns the second
+        second_arrival = to_pads[:, None] + self.travel_times
+        two_boost = np.minimum(one_boost[:, None] + np.where(respawn[None, :] <= second_arrival, self.pad_boost, 0), 100)
+        two_time = second_arrival + from_pads[None, :]
+        one_time[(one_boost < min_boost) | (one_time > deadline)] = np.inf
+        two_time[(two_boost < min_boost) | (two_time > deadline)] = np.inf
+        first = one_time.argmin()
+        pair = np.unravel_index(two_time.argmin(), two_time.shape)
+        if np.isinf(one_time[first]) and np.isinf(two_time[pair]):
+            return None
+        if one_time[first] <= two_time[pair]:
+            return Route([self.pads[first]], float(one_time[first]), float(one_boost[first]))
+        return Route([self.pads[pair[0]], self.pads[pair[1]]], float(two_time[pair]), float(two_boost[pair]))
@@ -0,0 +1,44 @@
+"""Module that checks whole trajectories of a car and the ball for contact, using the hitbox of the car in the packet"""
+from collections import namedtuple
+from enum import Enum
+
+import numpy as np
+
+import kernels
+
+ball_radius = 93.15
+
+Contact = namedtuple('Contact', ['index', 'local_point', 'hit'])
+
+
+class Hit(Enum):
+    Nothing = kernels.hit_none
+    Good = kernels.hit_good
+    # The ball is above the contact point and gets lifted
+    Under = kernels.hit_under
+    # The ball is below the contact point and gets pushed down
+    Over = kernels.hit_over
+
+
+def car_hitbox(game_arrays, index):
+    """Returns the half width and the offset from the center of mass of the hitbox of a car in the packet"""
+    return game_arrays.hitbox[index].astype(float) / 2, game_arrays.hitbox_offset[index].astype(float)
+
+
+def hitbox_contact(car_positions, orientation, hitbox, ball_locations):
+    """Returns whether the hitbox touches the ball and whether the touch is a good hit for (holds, slices, 3) car
+    positions with one orientation and (slices, 3) ball locations, hitbox is the result of car_hitbox"""
+    half_width, offset = hitbox
+    return kernels.obb_sphere_contact(np.ascontiguousarray(car_positions, float), np.ascontiguousarray(orientation, float),
+                                      half_width, offset, np.ascontiguousarray(ball_locations, float), ball_radius)
+
+
+def trajectory_contact(game_arrays, index, car_positions, orientations, ball_positions):
+    """Returns the first contact between the hitbox of the car with the given index and the ball, for n car positions
+    with their orientation matrices and n ball positions. The contact has the index into the trajectories, the contact
+    point in the local coordinates of the car and the hit class, the index is None when they never touch"""
+    half_width, offset = car_hitbox(game_arrays, index)
+    contact_index, local_point, hit = kernels.trajectory_contact(
+        np.ascontiguousarray(car_positions, float), np.ascontiguousarray(orientations, float), half_width, offset,
+        np.ascontiguousarray(ball_positions, float), ball_radius)
+    return Contact(contact_index if contact_index >= 0 else None, local_point, Hit(hit))
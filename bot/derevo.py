@@ -1,32 +1,51 @@
 """Main module"""
-import math
-import time
-import numpy as np
+from pathlib import Path
 from queue import Empty
+
+import numpy as np
 from rlbot.utils.game_state_util import GameState, BallState, CarState, Physics, Vector3, Rotator, GameInfoState
 
-from numba import jit
 from rlbot.agents.base_agent import BaseAgent
 from rlbot.agents.base_agent import SimpleControllerState
 from rlbot.matchcomms.common_uses.reply import reply_to
 from rlbot.matchcomms.common_uses.set_attributes_message import handle_set_attributes_message
 from rlbot.utils.structures.game_data_struct import GameTickPacket
 
-from boost import init_boostpads, update_boostpads
+from aerial import aerial_intercept
+from ball_prediction import BallPrediction, detect_events, advance_events, PredictionTracker, max_bounces
+from boost import init_boostpads, route_speed
+from contact import car_hitbox, ball_radius
 from custom_drive import CustomDrive as Drive
 from defending import defending
+from drive_table import get_drive_table
+from extended_prediction import ExtendedPrediction
+from game_arrays import GameArrays
 from goal import Goal
 from halfflip import HalfFlip
-from jump_sim import get_time_at_height, get_time_at_height_boost
+from jump_shot import prune_stats, warm_up, fps, max_duration
+from jump_table import get_jump_table
+from intercept import Intercepts
 from kick_off import init_kickoff, kick_off
+from plan_cache import PlanCache
+from profiler import TickProfiler
+from replay import Recorder, recording_path
 from rlutilities.linear_algebra import *
-from rlutilities.mechanics import Dodge, AerialTurn
-from rlutilities.simulation import Game, Car, obb, sphere
+from rlutilities.mechanics import Dodge, AerialTurn, Aerial
+from rlutilities.simulation import Game
+from shot_worker import ShotWorker
 from steps import Step
+from threat import Threats, shot_threshold, kickoff_margin
 from util import distance_2d, should_dodge, sign, velocity_2d, get_closest_big_pad, in_front_off_ball, get_intersect, \
-    should_halfflip, line_backline_intersect, not_back
+    should_halfflip, line_backline_intersect, not_back, to_array, orientation_to_array
 
 jeroens_magic_number = 5
+# Boost we pick up on the way when we have less, rotating may take up to the detour in seconds longer for it
+rotating_boost = 50
+rotating_detour = 1
+shooting_boost = 20
+# Times from now the jump shot search gets the ball at
+jump_shot_times = np.arange(round(fps * max_duration) + 1) / fps
+profile_path = Path(__file__).absolute().parent / 'tick_profile.csv'
 
 
 class Hypebot(BaseAgent):
@@ -42,11 +61,14 @@ class Hypebot(BaseAgent):
         self.drive = None
         self.dodge = None
         self.halfflip = None
+        self.aerial = None
+        self.aerial_touch = None
         self.controls = SimpleControllerState()
         self.kickoff = False
         self.prev_kickoff = False
         self.in_front_off_ball = False
         self.conceding = False
+        self.conceding_time = None
         self.kickoff_Start = None
         self.step = Step.Shooting
         self.time = 0
@@ -57,7 +79,25 @@ class Hypebot(BaseAgent):
         self.closest_to_ball = False
         self.defending = False
         self.set_state = False
-        self.ball_prediction_np = []
+        self.ball_prediction = None
+        self.ball_events = None
+        self.prediction_tracker = PredictionTracker()
+        self.prediction_change = None
+        self.extended_prediction = ExtendedPrediction()
+        self.intercepts = None
+        self.threats = None
+        self.game_arrays = GameArrays()
+        self.async_simulation = True
+        self.plan_cache = PlanCache()
+        self.shot_worker = ShotWorker(search=self.plan_cache.search, logger=self.logger)
+        self.latest_touch = None
+        self.profiler = TickProfiler()
+        self.render_profile = True
+        self.profile_dumped = False
+        self.record = False
+        self.recorder = None
+        self.bounces = []
+        self.ball_bouncing = False
 
     def initialize_agent(self):
         """Initializing all parameters which require the field info"""
@@ -68,30 +108,57 @@ class Hypebot(BaseAgent):
         self.drive = Drive(self.info.my_car)
         self.dodge = Dodge(self.info.my_car)
         self.halfflip = HalfFlip(self.info.my_car)
+        # Loads the drive table and the compiled kernels and runs the jump shot search once now instead of on the
+        # first ticks
+        if not get_drive_table().generated:
+            self.logger.warning('No generated drive table, using the analytic drive model. Run drive_table.py with '
+                                'RLUtilities to generate it')
+        get_jump_table()
+        warm_up()
+        if self.record:
+            # The background search depends on thread timing, so recordings search on the tick thread to replay to
+            # the same controls
+            self.async_simulation = False
+            self.recorder = Recorder(recording_path(self), self.get_field_info(), self.index, self.team,
+                                     self.async_simulation)
 
     def get_output(self, packet: GameTickPacket) -> SimpleControllerState:
         """The main method which receives the packets and outputs the controls"""
-        self.info.read_game_information(packet, self.get_field_info())
+        profiler = self.profiler
+        profiler.start_tick(packet.game_info.seconds_elapsed)
+        with profiler.stage('state read'):
+            self.info.read_game_information(packet, self.get_field_info())
+            ball_prediction_struct = self.get_ball_prediction_struct()
+            self.ball_prediction = BallPrediction.from_struct(ball_prediction_struct,
+                                                              packet.game_info.seconds_elapsed)
+        touch = packet.game_ball.latest_touch
+        self.latest_touch = (touch.player_index, touch.time_seconds)
+        self.prediction_change = self.prediction_tracker.update(self.ball_prediction, self.latest_touch)
+        profiler.set_metric('prediction change rate', self.prediction_tracker.change_rate)
+        with profiler.stage('boost update'):
+            self.game_arrays.update(packet)
+        with profiler.stage('intercept'):
+            game_arrays = self.game_arrays
+            self.extended_prediction.update(self.ball_prediction)
+            self.intercepts = Intercepts(game_arrays.position, game_arrays.velocity, game_arrays.forward,
+                                         game_arrays.boost, self.ball_prediction)
+            # Cars that can't reach the ball before the prediction of RLBot ends look for it in the extension
+            if not self.intercepts.found.all():
+                self.intercepts = Intercepts(game_arrays.position, game_arrays.velocity, game_arrays.forward,
+                                             game_arrays.boost, self.extended_prediction.extended())
+            self.threats = Threats(game_arrays, self.intercepts, self.index, to_array(self.my_goal.center))
         self.in_front_off_ball = in_front_off_ball(self.info.my_car.position, self.info.ball.position,
                                                    self.my_goal.center)
-        update_boostpads(self, packet)
         self.closest_to_ball = self.closest_to_the_ball()
-        self.predict()
+        with profiler.stage('predict'):
+            self.predict()
         self.time += self.info.time_delta
         if self.time > 5 and self.set_state:
             ball_state = BallState(Physics(location=Vector3(0, 5250, 250)))
             game_state = GameState(ball=ball_state)
             self.set_state = False
             self.set_game_state(game_state)
-        dtype = [('physics', [('location', '<f4', 3), ('rotation', [('pitch', '<f4'), ('yaw', '<f4'), ('roll', '<f4')]),
-                              ('velocity', '<f4', 3), ('angular_velocity', '<f4', 3)]), ('game_seconds', '<f4')]
-
-        self.ball_prediction_np = np.ctypeslib.as_array(self.get_ball_prediction_struct().slices).view(dtype)[
-                                  :self.get_ball_prediction_struct().num_slices]
-        self.teammates = []
-        for i in range(self.info.num_cars):
-            if self.info.cars[i].team == self.team and i != self.index:
-                self.teammates.append(i)
+        self.teammates = self.game_arrays.teammates(self.index).tolist()
         self.time = packet.game_info.seconds_elapsed
         # self.handle_match_comms()
         self.prev_kickoff = self.kickoff
@@ -103,58 +170,69 @@ class Hypebot(BaseAgent):
                 if self.closest_to_ball:
                     init_kickoff(self)
                     self.has_to_go = True
+                elif self.threats.earliest_time < min(self.intercepts.time[self.teammates]) - kickoff_margin:
+                    # An opponent beats our taker to the ball so we cover the goal instead of taking boost
+                    self.drive.target = self.my_goal.center
+                    self.drive.speed = 1399
                 else:
                     self.drive.target = get_closest_big_pad(self).location
                     self.drive.speed = 1399
             else:
                 init_kickoff(self)
                 self.has_to_go = True
-        if (self.kickoff or self.step == "Dodge2") and self.has_to_go:
-            kick_off(self)
-        elif self.kickoff and not self.has_to_go:
-            self.drive.step(self.info.time_delta)
-            self.controls = self.drive.controls
-        else:
-            if self.has_to_go:
-                self.has_to_go = False
-            self.get_controls()
-        self.render_string(self.step.name)
+        with profiler.stage('strategy'):
+            if (self.kickoff or self.step == "Dodge2") and self.has_to_go:
+                kick_off(self)
+            elif self.kickoff and not self.has_to_go:
+                self.drive.step(self.info.time_delta)
+                self.controls = self.drive.controls
+            else:
+                if self.has_to_go:
+                    self.has_to_go = False
+                self.get_controls()
+        with profiler.stage('render'):
+            self.render_string(self.step.name)
+            if self.render_profile:
+                profiler.render(self.renderer, 20, 120 if self.index == 0 else 620)
         # Make sure there is no variance in kickoff setups
         if not packet.game_info.is_round_active:
             self.controls.steer = 0
+        if self.recorder is not None:
+            with profiler.stage('record'):
+                self.recorder.record(packet, ball_prediction_struct, self.controls)
+        profiler.end_tick(self.step.name)
+        if packet.game_info.is_match_ended and not self.profile_dumped:
+            self.profile_dumped = True
+            profiler.dump_csv(profile_path)
         return self.controls
 
     def predict(self):
         """Method which uses ball prediction to fill in future data"""
-        self.bounces = []
-        self.ball_bouncing = False
-        ball_prediction = self.get_ball_prediction_struct()
-        if ball_prediction is not None:
-            prev_ang_velocity = normalize(self.info.ball.angular_velocity)
-            for i in range(ball_prediction.num_slices):
-                prediction_slice = ball_prediction.slices[i]
-                physics = prediction_slice.physics
-                if physics.location.y * sign(self.team) > 5120:
-                    self.conceding = True
-                if physics.location.z > 180:
-                    self.ball_bouncing = True
-                    continue
-                current_ang_velocity = normalize(
-                    vec3(physics.angular_velocity.x, physics.angular_velocity.y, physics.angular_velocity.z))
-                if physics.location.z < 125 and prev_ang_velocity != current_ang_velocity:
-                    self.bounces.append((vec3(physics.location.x, physics.location.y, physics.location.z),
-                                         prediction_slice.game_seconds - self.time))
-                    if len(self.bounces) > 15:
-                        return
-                prev_ang_velocity = current_ang_velocity
+        tracker = self.prediction_tracker
+        # Events are advanced while the path stays the same, a full list of bounces can miss the ones at the new end
+        if self.prediction_change is None and self.ball_events is not None and \
+                len(self.ball_events.bounce_indices) < max_bounces:
+            self.ball_events = advance_events(self.ball_events, self.ball_prediction, tracker.shift,
+                                              tracker.elapsed)
+        else:
+            self.ball_events = detect_events(self.ball_prediction, to_array(self.info.ball.angular_velocity),
+                                             sign(self.team))
+        self.bounces = [(self.ball_prediction.location(i), self.ball_prediction.time_until[i])
+                        for i in self.ball_events.bounce_indices]
+        self.ball_bouncing = self.ball_events.bouncing
+        self.conceding = self.ball_events.conceding_index is not None
+        self.conceding_time = None
+        if self.conceding:
+            # The time the ball crosses our goal line, None when it is already behind it
+            self.conceding_time = self.ball_prediction.trajectory.first_crossing_y(sign(self.team) * 5120)
 
     def closest_to_the_ball(self):
-        dist_to_ball = math.inf
-        for i in range(len(self.teammates)):
-            teammate_car = self.info.cars[self.teammates[i]]
-            if distance_2d(teammate_car.position, get_intersect(self, teammate_car)) < dist_to_ball:
-                dist_to_ball = distance_2d(teammate_car.position, get_intersect(self, teammate_car))
-        return distance_2d(self.info.my_car.position, get_intersect(self, self.info.my_car)) <= dist_to_ball
+        """Returns whether we get to the ball before our teammates, the distance to the intercept breaks ties"""
+        def arrival(index):
+            return self.intercepts.time[index], distance_2d(self.info.cars[index].position, get_intersect(self, index))
+
+        my_arrival = arrival(self.index)
+        return all(my_arrival <= arrival(teammate) for teammate in self.teammates)
 
     def get_controls(self):
         """Decides what strategy to uses and gives corresponding output"""
@@ -164,13 +242,12 @@ class Hypebot(BaseAgent):
             # self.set_state = True
             self.step = Step.Shooting
         if self.step == Step.Shooting:
-            target = get_intersect(self, self.info.my_car)
+            target = self.route_target(get_intersect(self, self.index), shooting_boost,
+                                       self.intercepts.time[self.index])
             self.drive.target = target
             self.drive.step(self.info.time_delta)
             self.controls = self.drive.controls
-            t = time.time()
             can_dodge, simulated_duration, simulated_target = self.simulate(self.their_goal.center)
-            # print(time.time() - t)
             if can_dodge:
                 self.dodge = Dodge(self.info.my_car)
                 self.turn = AerialTurn(self.info.my_car)
@@ -180,6 +257,11 @@ class Hypebot(BaseAgent):
                 target = vec3(vec2(self.their_goal.center)) + vec3(0, 0, jeroens_magic_number * simulated_target[2])
                 self.dodge.preorientation = look_at(target - simulated_target, vec3(0, 0, 1))
                 self.step = Step.Dodge
+            elif self.closest_to_ball:
+                aerial_plan = self.plan_aerial()
+                if aerial_plan is not None:
+                    self.start_aerial(aerial_plan)
+                    return
             if self.should_defend():
                 self.step = Step.Defending
             elif not self.closest_to_ball or self.in_front_off_ball:
@@ -194,6 +276,11 @@ class Hypebot(BaseAgent):
                 self.dodge.duration = 0.1
         elif self.step == Step.Rotating:
             target = 0.5 * (self.info.ball.position - self.my_goal.center) + self.my_goal.center
+            # We rotate all the way back when an opponent is about to shoot at our goal
+            if self.threats.danger() > shot_threshold:
+                target = self.my_goal.center
+            target = self.route_target(target, rotating_boost,
+                                       distance_2d(self.info.my_car.position, target) / route_speed + rotating_detour)
             self.drive.target = target
             self.drive.speed = 1410
             self.drive.step(self.info.time_delta)
@@ -229,6 +316,12 @@ class Hypebot(BaseAgent):
 
         elif self.step == Step.Defending:
             defending(self)
+        elif self.step == Step.Aerial:
+            self.aerial.step(self.info.time_delta)
+            self.controls = self.aerial.controls
+            # The plan is useless once the aerial is over or the ball got touched
+            if self.aerial.finished or self.latest_touch != self.aerial_touch:
+                self.step = Step.Shooting
         elif self.step == Step.Dodge or self.step == Step.HalfFlip:
             halfflipping = self.step == Step.HalfFlip
             if halfflipping:
@@ -243,6 +336,18 @@ class Hypebot(BaseAgent):
                     self.controls.boost = False
                 self.controls.throttle = velocity_2d(self.info.my_car.velocity) < 500
 
+    def retire(self):
+        """Stops the background workers, closes the recording and saves the tick profile when the bot gets shut down"""
+        self.shot_worker.shutdown()
+        for line in self.plan_cache.report():
+            self.logger.info(line)
+        if self.shot_worker.errors > 0:
+            self.logger.warning(f'{self.shot_worker.errors} jump shot searches failed')
+        if self.recorder is not None:
+            self.recorder.close()
+        if not self.profile_dumped:
+            self.profiler.dump_csv(profile_path)
+
     def handle_match_comms(self):
         try:
             msg = self.matchcomms.incoming_broadcast.get_nowait()
@@ -265,125 +370,83 @@ class Hypebot(BaseAgent):
             self.renderer.draw_string_2d(20, 520, 3, 3, string, self.renderer.red())
         self.renderer.end_rendering()
 
-    # The miraculous simulate function
-    # TODO optimize heavily in case I actually need it
-    # Option one: estimate the time for the current height and look at that ball prediction.
-    # If its heigher use that unless it gets unreachable and else compare with the lower one.
-    # If duration_estimate = 0.8 and the ball is moving up there is not sense in even simulating it.
-    # Might even lower it since the higher the duration estimate the longer the simulation takes.
     def simulate(self, global_target=None):
-        lol = 0
-        # Initialize the ball prediction
-        # Estimate the probable duration of the jump and round it down to the floor decimal
-        ball_prediction = self.get_ball_prediction_struct()
-        if self.info.my_car.boost < 6:
-            duration_estimate = math.floor(get_time_at_height(self.info.ball.position[2]) * 10) / 10
-        else:
-            adjacent = norm(vec2(self.info.my_car.position - self.info.ball.position))
-            opposite = (self.info.ball.position[2] - self.info.my_car.position[2])
-            theta = math.atan(opposite / adjacent)
-            t = get_time_at_height_boost(self.info.ball.position[2], theta, self.info.my_car.boost)
-            duration_estimate = (math.ceil(t * 10) / 10)
-        # Loop for 6 frames meaning adding 0.1 to the estimated duration. Keeps the time constraint under 0.3s
-        for i in range(6):
-            # Copy the car object and reset the values for the hitbox
-            car = Car(self.info.my_car)
-            # Create a dodge object on the copied car object
-            # Direction is from the ball to the enemy goal
-            # Duration is estimated duration plus the time added by the for loop
-            # preorientation is the rotation matrix from the ball to the goal
-            # TODO make it work on both sides
-            #  Test with preorientation. Currently it still picks a low duration at a later time meaning it
-            #  wont do any of the preorientation.
-            dodge = Dodge(car)
-            prediction_slice = ball_prediction.slices[round(60 * (duration_estimate + i / 60))]
-            physics = prediction_slice.physics
-            ball_location = vec3(physics.location.x, physics.location.y, physics.location.z)
-            # ball_location = vec3(0, ball_y, ball_z)
-            dodge.duration = duration_estimate + i / 60
-            if dodge.duration > 1.4:
-                break
-
-            if global_target is not None:
-                dodge.direction = vec2(global_target - ball_location)
-                target = vec3(vec2(global_target)) + vec3(0, 0, jeroens_magic_number * ball_location[2])
-                dodge.preorientation = look_at(target - ball_location, vec3(0, 0, 1))
-            else:
-                dodge.target = ball_location
-                dodge.direction = vec2(ball_location) + vec2(ball_location - car.position)
-                dodge.preorientation = look_at(ball_location, vec3(0, 0, 1))
-            # Loop from now till the end of the duration
-            fps = 30
-            for j in range(round(fps * dodge.duration)):
-                lol = lol + 1
-                # Get the ball prediction slice at this time and convert the location to RLU vec3
-                prediction_slice = ball_prediction.slices[round(60 * j / fps)]
-                physics = prediction_slice.physics
-                ball_location = vec3(physics.location.x, physics.location.y, physics.location.z)
-                dodge.step(1 / fps)
+        """Returns whether we can dodge, the time until we hit the ball and the location of the ball at that time"""
+        with self.profiler.stage('dodge sim'):
+            result = self.search_jump_shot()
+        self.profiler.set_metric('pruned jump shot pairs', prune_stats.fraction)
+        self.profiler.set_metric('plan cache hit rate', self.plan_cache.hit_rate)
+        return result
 
-                T = dodge.duration - dodge.timer
-                if T > 0:
-                    if dodge.timer < 0.2:
-                        dodge.controls.boost = 1
-                        dodge.controls.pitch = 1
-                    else:
-                        xf = car.position + 0.5 * T * T * vec3(0, 0, -650) + T * car.velocity
-
-                        delta_x = ball_location - xf
-                        if angle_between(vec2(car.forward()), dodge.direction) < 0.3:
-                            if norm(delta_x) > 50:
-                                dodge.controls.boost = 1
-                                dodge.controls.throttle = 0.0
-                            else:
-                                dodge.controls.boost = 0
-                                dodge.controls.throttle = clip(0.5 * (200 / 3) * T * T, 0.0, 1.0)
-                        else:
-                            dodge.controls.boost = 0
-                            dodge.controls.throttle = 0.0
-                else:
-                    dodge.controls.boost = 0
-
-                car.step(dodge.controls, 1 / fps)
-                succesfull = self.dodge_succesfull(car, ball_location, dodge)
-                if succesfull is not None:
-                    if succesfull:
-                        return True, j / fps, ball_location
-                    else:
-                        break
-        return False, None, None
+    def search_jump_shot(self):
+        """Runs the jump shot search of simulate"""
+        if not self.info.my_car.on_ground:
+            return False, None, None
+        state = self.jump_shot_state()
+        if self.async_simulation:
+            self.shot_worker.submit(self.time, *state, self.time, self.latest_touch)
+            plan = self.shot_worker.plan(self.time)
+            if plan is None or not plan.can_dodge or plan.duration - plan.staleness <= 0:
+                return False, None, None
+            can_dodge, duration, target = True, plan.duration - plan.staleness, plan.target
+        else:
+            can_dodge, duration, target = self.plan_cache.search(*state, self.time, self.latest_touch)
+        if not can_dodge:
+            return False, None, None
+        return True, duration, vec3(target[0], target[1], target[2])
 
-    def dodge_succesfull(self, car, ball_location, dodge):
-        batmobile = obb()
-        batmobile.half_width = vec3(64.4098892211914, 42.335182189941406, 14.697200775146484)
-        batmobile.center = car.position + dot(car.orientation, vec3(9.01, 0, 12.09))
-        batmobile.orientation = car.orientation
-        ball = sphere(ball_location, 93.15)
-        b_local = dot(ball.center - batmobile.center, batmobile.orientation)
+    def jump_shot_state(self):
+        """Returns the arguments of jump_shot for our car and the ball at the jump shot times from now"""
+        car = self.info.my_car
+        ball_locations = self.ball_prediction.trajectory.position_at(jump_shot_times) \
+            if self.ball_prediction.num_slices > 0 else self.ball_prediction.position
+        return (to_array(car.position), to_array(car.velocity), orientation_to_array(car.orientation), car.boost,
+                ball_locations, car_hitbox(self.game_arrays, self.index))
 
-        closest_local = vec3(
-            min(max(b_local[0], -batmobile.half_width[0]), batmobile.half_width[0]),
-            min(max(b_local[1], -batmobile.half_width[1]), batmobile.half_width[1]),
-            min(max(b_local[2], -batmobile.half_width[2]), batmobile.half_width[2])
-        )
+    def route_target(self, target, min_boost, deadline):
+        """Returns the first boost pad of the fastest route to the target that gets us min_boost before the deadline in
+        seconds from now, or the target itself when we have enough boost or no route makes it in time"""
+        car = self.info.my_car
+        if car.boost >= min_boost:
+            return target
+        route = self.boost_routes.best_route(to_array(car.position), to_array(target), car.boost, min_boost, deadline)
+        if route is None or len(route.pads) == 0:
+            return target
+        return route.pads[0].location
 
-        hit_location = dot(batmobile.orientation, closest_local) + batmobile.center
-        if norm(hit_location - ball.center) > ball.radius:
+    def plan_aerial(self):
+        """Returns the earliest viable aerial on the ball prediction when it beats driving to our intercept or when our
+        intercept is too high for a jump to reach, otherwise None"""
+        car = self.info.my_car
+        if not car.on_ground or self.ball_prediction.num_slices == 0:
             return None
-        # if abs(ball_location[2] - hit_location[2]) < 25 and hit_location[2] < ball_location[2]:
-        if abs(ball_location[2] - hit_location[2]) < 25:
-            if closest_local[0] > 35 and -12 < closest_local[2] < 12:
-                hit_check = True
-            else:
-                print("local: ", closest_local)
-                hit_check = True
-        else:
-            hit_check = False
-        # Seems to work without angle_check. No clue why though
-        angle_car_simulation = angle_between(car.orientation, self.info.my_car.orientation)
-        angle_simulation_target = angle_between(car.orientation, dodge.preorientation)
-        angle_check = angle_simulation_target < angle_car_simulation or angle_simulation_target < 0.1
-        return hit_check
+        with self.profiler.stage('aerial plan'):
+            plan = aerial_intercept(to_array(car.position), to_array(car.velocity), to_array(car.forward()),
+                                    to_array(car.up()), car.boost, self.ball_prediction.position,
+                                    self.ball_prediction.time_until, to_array(self.their_goal.center))
+        if plan is None:
+            return None
+        if plan.index > 0:
+            # The slice is refined at 120 fps between it and the slice before it, the index is then into that window
+            game_seconds = self.ball_prediction.game_seconds
+            window = self.extended_prediction.window(game_seconds[plan.index - 1], game_seconds[plan.index])
+            plan = aerial_intercept(to_array(car.position), to_array(car.velocity), to_array(car.forward()),
+                                    to_array(car.up()), car.boost, window.position, window.time_until,
+                                    to_array(self.their_goal.center)) or plan
+        # The car touches the ball from below when its center is about a ball radius under the center of the ball
+        intercept_height = self.intercepts.ball_prediction.height[self.intercepts.index[self.index]] - ball_radius
+        if plan.time >= self.intercepts.time[self.index] and \
+                get_jump_table().reaches(intercept_height, np.pi / 2, car.boost):
+            return None
+        return plan
+
+    def start_aerial(self, plan):
+        """Starts the RLUtilities aerial towards the target of the plan"""
+        self.aerial = Aerial(self.info.my_car)
+        self.aerial.target = vec3(float(plan.target[0]), float(plan.target[1]), float(plan.target[2]))
+        self.aerial.arrival_time = self.time + float(plan.time)
+        self.aerial_touch = self.latest_touch
+        self.step = Step.Aerial
 
     def should_defend(self):
         """Method which returns a boolean regarding whether we should defend or not"""
@@ -392,7 +455,9 @@ class Hypebot(BaseAgent):
         car_to_ball = ball.position - car.position
         in_front_of_ball = self.in_front_off_ball
         backline_intersect = line_backline_intersect(self.my_goal.center[1], vec2(car.position), vec2(car_to_ball))
-        return (in_front_of_ball and abs(backline_intersect) < 2000) or self.conceding
+        # An opponent gets to the ball before us and is likely to shoot at our goal
+        threatened = self.threats.danger(self.intercepts.time[self.index]) > shot_threshold
+        return (in_front_of_ball and abs(backline_intersect) < 2000) or self.conceding or threatened
 
     def close_to_kickoff_spawn(self):
         blue_one = distance_2d(self.info.my_car.position, vec3(-2048, -2560, 18)) < 10
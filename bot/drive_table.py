@@ -0,0 +1,167 @@
+"""Module with lookup tables for the time it takes to drive to a location and the boost that takes"""
+from pathlib import Path
+
+import numpy as np
+
+from intercept import drive_distance, turn_time, boost_consumption, curvature_speeds, curvatures
+from jump_table import grid_index
+
+table_path = Path(__file__).absolute().parent / 'drive_table.npz'
+# Bump the version whenever the simulation, the analytic model or the grids change. Without a file of this version the
+# analytic model is built and saved, it is used until the tables are generated again by running this module
+table_version = 2
+# Drives that take longer than this are not reachable
+max_time = 10
+time_step = 1 / 120
+# The car has arrived when its center is this close to the target
+arrival_radius = 50
+
+distances = np.linspace(0, 13000, 27)
+angles = np.linspace(0, np.pi, 9)
+speeds = np.linspace(0, 2300, 6)
+boosts = np.linspace(0, 100, 5)
+
+
+class DriveTable:
+    """Class that answers the minimum time to drive to a target and the boost that uses by interpolating tables over
+    the distance to the target, the angle between the forward of the car and the target, the forward speed and the
+    boost of the car"""
+
+    def __init__(self, times, boost_used, generated):
+        self.times = times
+        self.boost_used = boost_used
+        # Whether the tables come from the Drive simulation or from the analytic model
+        self.generated = generated
+
+    @classmethod
+    def generate(cls):
+        """Generates the tables by driving the RLUtilities Drive mechanic for every grid point, this takes a while"""
+        shape = (len(distances), len(angles), len(speeds), len(boosts))
+        times = np.empty(shape)
+        boost_used = np.empty(shape)
+        for i, j, k, m in np.ndindex(shape):
+            times[i, j, k, m], boost_used[i, j, k, m] = simulate_drive(distances[i], angles[j], speeds[k], boosts[m])
+        return cls(times, boost_used, True)
+
+    @classmethod
+    def analytic(cls):
+        """Builds the tables out of the drive model of intercept.py, which is used when there is no generated file.
+        The car turns to the target at a speed whose turning circle doesn't contain the target and then drives straight
+        at it"""
+        shape = (len(distances), len(angles), len(speeds), len(boosts))
+        times = np.empty(shape)
+        boost_used = np.empty(shape)
+        t = np.arange(0, max_time + time_step / 2, time_step)
+        for j, k, m in np.ndindex(len(angles), len(speeds), len(boosts)):
+            speed = np.minimum(speeds[k], turning_speed(distances, angles[j]))
+            driven = drive_distance(t[:, None], speed[None, :], boosts[m])
+            for i in range(len(distances)):
+                drive = np.interp(max(distances[i] - arrival_radius, 0), driven[:, i], t, right=max_time)
+                times[i, j, k, m] = turn_time(angles[j], speed[i]) + drive
+                boost_used[i, j, k, m] = min(boosts[m], boost_consumption * drive)
+        times[distances <= arrival_radius] = 0
+        boost_used[distances <= arrival_radius] = 0
+        return cls(np.minimum(times, max_time), boost_used, False)
+
+    @classmethod
+    def load(cls, path=table_path):
+        """Loads the tables from disk, without them the tables are built from the analytic model and saved so the next
+        start doesn't build them again"""
+        if path.exists():
+            with np.load(path) as data:
+                if data['version'] == table_version:
+                    return cls(data['times'], data['boost_used'], bool(data['generated']))
+        table = cls.analytic()
+        table.save(path)
+        return table
+
+    def save(self, path=table_path):
+        """Saves the tables to disk as float32 to keep the file small"""
+        np.savez_compressed(path, version=table_version, times=self.times.astype(np.float32),
+                            boost_used=self.boost_used.astype(np.float32), generated=self.generated)
+
+    def lookup(self, distance, angle, speed, boost):
+        """Returns the time to drive to a target and the boost that uses. All arguments can be arrays and are broadcast
+        against each other, the angle is in radians to either side"""
+        distance, angle, speed, boost = np.broadcast_arrays(distance, np.abs(angle), speed, boost)
+        cells = [grid_index(distances, distance), grid_index(angles, np.minimum(angle, np.pi)),
+                 grid_index(speeds, speed), grid_index(boosts, boost)]
+        time = 0
+        boost_used = 0
+        # Quadrilinear interpolation over the 16 corners of the cell
+        for corner in np.ndindex(2, 2, 2, 2):
+            weight = 1
+            index = []
+            for offset, (cell, fraction) in zip(corner, cells):
+                weight = weight * (fraction if offset else 1 - fraction)
+                index.append(cell + offset)
+            time = time + weight * self.times[tuple(index)]
+            boost_used = boost_used + weight * self.boost_used[tuple(index)]
+        return time, boost_used
+
+    def arrival(self, position, forward, velocity, boost, targets):
+        """Returns the time to drive to every row of the (n, 3) targets and the boost that uses for a car with the
+        numpy position, forward and velocity"""
+        car_to_target = targets[:, :2] - position[:2]
+        distance = np.linalg.norm(car_to_target, axis=1)
+        angle = np.arctan2(forward[0] * car_to_target[:, 1] - forward[1] * car_to_target[:, 0],
+                           car_to_target @ forward[:2])
+        speed = max(np.dot(velocity[:2], forward[:2]) / max(np.linalg.norm(forward[:2]), 1e-10), 0)
+        return self.lookup(distance, angle, speed, boost)
+
+
+def turning_speed(distance, angle):
+    """Returns the highest speed at which the turning circle of the car doesn't contain a target at the distance and
+    angle, so the car can still turn onto it"""
+    curvature = 2 * np.sin(min(abs(angle), np.pi / 2)) / np.maximum(distance, 1e-10)
+    return np.interp(curvature, curvatures[::-1], curvature_speeds[::-1])
+
+
+def simulate_drive(distance, angle, speed, boost):
+    """Returns the time the RLUtilities Drive mechanic takes to get to a target at the distance and angle from a car
+    driving straight at the speed with the boost, and the boost it used. Drives that don't arrive take the max time"""
+    # RLUtilities is only needed to generate the tables
+    from rlutilities.linear_algebra import vec3, norm, vec2, axis_to_rotation
+    from rlutilities.mechanics import Drive
+    from rlutilities.simulation import Car
+    car = Car()
+    car.position = vec3(0, 0, 17.01)
+    # Facing along the x axis, which the angle to the target is measured from
+    car.orientation = axis_to_rotation(vec3(0, 0, 0))
+    car.velocity = vec3(speed, 0, 0)
+    car.angular_velocity = vec3(0, 0, 0)
+    car.boost = int(boost)
+    car.on_ground = True
+    car.time = 0
+    target = vec3(distance * np.cos(angle), distance * np.sin(angle), 17.01)
+    drive = Drive(car)
+    drive.target = target
+    drive.speed = 2300
+    time = 0
+    while time < max_time:
+        if norm(vec2(target - car.position)) <= arrival_radius:
+            return time, boost - car.boost
+        drive.step(time_step)
+        car.step(drive.controls, time_step)
+        time += time_step
+    return max_time, boost - car.boost
+
+
+_drive_table = None
+
+
+def get_drive_table():
+    """Returns the drive table, loading it the first time"""
+    global _drive_table
+    if _drive_table is None:
+        _drive_table = DriveTable.load()
+    return _drive_table
+
+
+if __name__ == '__main__':
+    drive_table = DriveTable.generate()
+    drive_table.save()
+    analytic = DriveTable.analytic()
+    difference = np.abs(drive_table.times - analytic.times)
+    print(f'Saved {table_path}, compared to the analytic model the times differ {difference.mean():.3f}s on average '
+          f'and {difference.max():.3f}s at most')
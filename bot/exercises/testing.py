@@ -1,3 +1,5 @@
+import os
+import sys
 import unittest
 from pathlib import Path
 
@@ -6,7 +8,13 @@ from rlbot.training.training import Pass
 from rlbottraining.common_exercises.silver_goalie import *
 from rlbottraining.common_exercises.silver_striker import HookShot
 from rlbottraining.common_exercises.dribbling import Dribbling
-from rlbottraining.exercise_runner import run_playlist
+
+if os.environ.get('HEADLESS'):
+    # Run the exercises on the local simulation instead of the game
+    sys.path.append(str(Path(__file__).absolute().parent.parent))
+    from local_match import run_playlist
+else:
+    from rlbottraining.exercise_runner import run_playlist
 
 
 class MainTest(unittest.TestCase):
@@ -0,0 +1,161 @@
+"""Module that extends the ball prediction of RLBot past its horizon and resamples it at a higher rate, by stepping the
+RLUtilities ball from the slices of the prediction"""
+import numpy as np
+
+from ball_prediction import BallPrediction, fps, max_prediction_error
+from rlutilities.linear_algebra import vec3
+from rlutilities.simulation import Ball
+
+# Rate of the extension and of the resampled windows
+extension_fps = 120
+# The extension reaches this many seconds past the current time
+extended_horizon = 10
+# The extension grows by at most this many steps per tick, so starting it over is spread across ticks
+max_steps_per_tick = 60
+
+
+def ball_at_slice(ball_prediction, index):
+    """Returns an RLUtilities ball with the state of a slice of the ball prediction"""
+    ball = Ball()
+    ball.position = vec3(*map(float, ball_prediction.position[index]))
+    ball.velocity = vec3(*map(float, ball_prediction.velocity[index]))
+    ball.angular_velocity = vec3(*map(float, ball_prediction.angular_velocity[index]))
+    ball.time = float(ball_prediction.game_seconds[index])
+    return ball
+
+
+class BallSteps:
+    """Class that steps an RLUtilities ball at the extension rate and keeps the states as numpy arrays"""
+
+    def __init__(self, ball, capacity):
+        self.ball = ball
+        self.game_seconds = np.empty(capacity)
+        self.position = np.empty((capacity, 3))
+        self.velocity = np.empty((capacity, 3))
+        self.angular_velocity = np.empty((capacity, 3))
+        self.count = 0
+        self.store()
+
+    def store(self):
+        """Stores the state of the ball after the last state"""
+        if self.count == len(self.game_seconds):
+            self.grow()
+        ball = self.ball
+        self.game_seconds[self.count] = ball.time
+        self.position[self.count] = ball.position[0], ball.position[1], ball.position[2]
+        self.velocity[self.count] = ball.velocity[0], ball.velocity[1], ball.velocity[2]
+        self.angular_velocity[self.count] = ball.angular_velocity[0], ball.angular_velocity[1], \
+            ball.angular_velocity[2]
+        self.count += 1
+
+    def grow(self):
+        """Doubles the capacity of the arrays"""
+        for name in ['game_seconds', 'position', 'velocity', 'angular_velocity']:
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate([array, np.empty_like(array)]))
+
+    def step(self, until, max_steps):
+        """Steps the ball until the last state is at the game time or the steps run out and returns the steps taken"""
+        steps = 0
+        while self.game_seconds[self.count - 1] < until and steps < max_steps:
+            self.ball.step(1 / extension_fps)
+            self.store()
+            steps += 1
+        return steps
+
+    def drop(self, count):
+        """Forgets the first count states"""
+        count = min(count, self.count - 1)
+        if count <= 0:
+            return
+        for array in [self.game_seconds, self.position, self.velocity, self.angular_velocity]:
+            array[:self.count - count] = array[count:self.count]
+        self.count -= count
+
+    def prediction(self, start, stride, time):
+        """Returns every stride-th state from the start index on as a BallPrediction with the current time"""
+        rows = slice(start, self.count, stride)
+        return BallPrediction.from_arrays(self.position[rows], self.velocity[rows], self.angular_velocity[rows],
+                                          self.game_seconds[rows], time)
+
+
+class ExtendedPrediction:
+    """Class that keeps the ball prediction of RLBot going past its last slice. The extension starts at the last slice
+    and is kept across ticks, every tick it only drops the states RLBot now covers and grows to the new horizon.
+    It starts over when the last slice of RLBot is too far from where the extension has the ball at that time"""
+
+    def __init__(self, horizon=extended_horizon):
+        self.horizon = horizon
+        self.steps = None
+        self.ball_prediction = None
+        self.restarts = 0
+        self._extended = None
+
+    def update(self, ball_prediction):
+        """Matches the extension to the new ball prediction of RLBot and grows it by at most max_steps_per_tick"""
+        self.ball_prediction = ball_prediction
+        self._extended = None
+        if ball_prediction.num_slices == 0:
+            self.steps = None
+            return
+        end = float(ball_prediction.game_seconds[-1])
+        if not self.matches(ball_prediction):
+            self.steps = BallSteps(ball_at_slice(ball_prediction, -1), extension_fps * self.horizon)
+            self.restarts += 1
+        else:
+            self.steps.drop(int(round((end - self.steps.game_seconds[0]) * extension_fps)))
+        self.steps.step(ball_prediction.time + self.horizon, max_steps_per_tick)
+
+    def matches(self, ball_prediction):
+        """Returns whether the extension has the ball where the last slice of the new ball prediction has it"""
+        steps = self.steps
+        if steps is None:
+            return False
+        end = float(ball_prediction.game_seconds[-1])
+        index = int(round((end - steps.game_seconds[0]) * extension_fps))
+        if index < 0 or index >= steps.count:
+            return False
+        error = np.abs(steps.position[index] - ball_prediction.position[-1]).max()
+        return error <= max_prediction_error
+
+    @property
+    def end(self):
+        """Game time of the last state of the extension"""
+        if self.steps is None:
+            return self.ball_prediction.game_seconds[-1] if self.ball_prediction.num_slices > 0 else 0
+        return self.steps.game_seconds[self.steps.count - 1]
+
+    def extended(self):
+        """Returns the ball prediction of RLBot followed by the extension at the same 60 fps, built once per tick"""
+        if self._extended is None:
+            ball_prediction = self.ball_prediction
+            if self.steps is None or self.steps.count < 2:
+                self._extended = ball_prediction
+            else:
+                stride = extension_fps // fps
+                extension = self.steps.prediction(stride, stride, ball_prediction.time)
+                self._extended = BallPrediction.from_arrays(
+                    np.concatenate([ball_prediction.position, extension.position]),
+                    np.concatenate([ball_prediction.velocity, extension.velocity]),
+                    np.concatenate([ball_prediction.angular_velocity, extension.angular_velocity]),
+                    np.concatenate([ball_prediction.game_seconds, extension.game_seconds]), ball_prediction.time)
+        return self._extended
+
+    def window(self, start, end):
+        """Returns the ball between the game times start and end at 120 fps as a BallPrediction. Within the horizon of
+        RLBot the ball is stepped from the slice before the start, past it the extension is used"""
+        ball_prediction = self.ball_prediction
+        if ball_prediction.num_slices == 0:
+            return ball_prediction
+        if self.steps is not None and start >= self.steps.game_seconds[0]:
+            first = int(np.searchsorted(self.steps.game_seconds[:self.steps.count], start - 1e-6))
+            last = int(np.searchsorted(self.steps.game_seconds[:self.steps.count], end + 1e-6))
+            rows = slice(first, last)
+            return BallPrediction.from_arrays(self.steps.position[rows], self.steps.velocity[rows],
+                                              self.steps.angular_velocity[rows], self.steps.game_seconds[rows],
+                                              ball_prediction.time)
+        index = max(int(np.searchsorted(ball_prediction.game_seconds, start + 1e-6)) - 1, 0)
+        steps = BallSteps(ball_at_slice(ball_prediction, index), int((end - start) * extension_fps) + 2)
+        steps.step(end - 1e-6, int(np.ceil((end - steps.game_seconds[0]) * extension_fps)) + 1)
+        first = int(np.searchsorted(steps.game_seconds[:steps.count], start - 1e-6))
+        return steps.prediction(first, 1, ball_prediction.time)
@@ -0,0 +1,95 @@
+"""Module that mirrors the game tick packet into numpy arrays"""
+import ctypes
+
+import numpy as np
+
+from rlbot.utils.structures.game_data_struct import PlayerInfo, BoostPadState
+
+
+def field_offset(struct, path):
+    """Returns the byte offset of a nested field like 'physics.location' within a ctypes struct"""
+    offset = 0
+    for name in path.split('.'):
+        offset += getattr(struct, name).offset
+        struct = dict(struct._fields_)[name]
+    return offset
+
+
+def struct_dtype(struct, fields):
+    """Returns a numpy dtype that views the given (name, path, format) fields of a ctypes struct in place"""
+    return np.dtype({'names': [name for name, _, _ in fields],
+                     'formats': [data_format for _, _, data_format in fields],
+                     'offsets': [field_offset(struct, path) for _, path, _ in fields],
+                     'itemsize': ctypes.sizeof(struct)})
+
+
+car_dtype = struct_dtype(PlayerInfo, [
+    ('location', 'physics.location', ('<f4', 3)),
+    ('rotation', 'physics.rotation', ('<f4', 3)),
+    ('velocity', 'physics.velocity', ('<f4', 3)),
+    ('angular_velocity', 'physics.angular_velocity', ('<f4', 3)),
+    ('is_demolished', 'is_demolished', '?'),
+    ('has_wheel_contact', 'has_wheel_contact', '?'),
+    ('team', 'team', 'u1'),
+    ('boost', 'boost', '<i4'),
+    ('hitbox', 'hitbox', ('<f4', 3)),
+    ('hitbox_offset', 'hitbox_offset', ('<f4', 3)),
+])
+pad_dtype = struct_dtype(BoostPadState, [
+    ('is_active', 'is_active', '?'),
+    ('timer', 'timer', '<f4'),
+])
+
+
+class GameArrays:
+    """Class that holds the cars and boost pads of the current packet as read only numpy arrays"""
+
+    def __init__(self):
+        self.packet = None
+        self.packet_cars = np.zeros(0, car_dtype)
+        self.packet_pads = np.zeros(0, pad_dtype)
+        self.num_cars = 0
+        self.cars = self.packet_cars
+        self.pads = self.packet_pads
+        self.set_columns()
+
+    def update(self, packet):
+        """Views the cars and boost pads of the packet in place, the views are only rebuilt for a new packet object"""
+        if packet is not self.packet:
+            self.packet = packet
+            self.packet_cars = np.frombuffer(packet.game_cars, car_dtype)
+            self.packet_pads = np.frombuffer(packet.game_boosts, pad_dtype)
+            self.packet_cars.flags.writeable = False
+            self.packet_pads.flags.writeable = False
+        self.num_cars = packet.num_cars
+        self.cars = self.packet_cars[:packet.num_cars]
+        self.pads = self.packet_pads[:packet.num_boost]
+        self.set_columns()
+
+    def set_columns(self):
+        """Sets the column views and the derived columns"""
+        self.position = self.cars['location']
+        self.rotation = self.cars['rotation']
+        self.velocity = self.cars['velocity']
+        self.angular_velocity = self.cars['angular_velocity']
+        self.boost = self.cars['boost']
+        self.team = self.cars['team']
+        self.is_demolished = self.cars['is_demolished']
+        self.on_ground = self.cars['has_wheel_contact']
+        self.hitbox = self.cars['hitbox']
+        self.hitbox_offset = self.cars['hitbox_offset']
+        self.pad_active = self.pads['is_active']
+        self.pad_timer = self.pads['timer']
+        pitch, yaw = self.rotation[:, 0], self.rotation[:, 1]
+        self.forward = np.column_stack((np.cos(pitch) * np.cos(yaw), np.cos(pitch) * np.sin(yaw), np.sin(pitch)))
+        self.forward.flags.writeable = False
+
+    def teammates(self, index):
+        """Returns the indices of the cars in the same team as the car with the given index, without that car"""
+        teammates = self.team == self.team[index]
+        teammates[index] = False
+        return np.flatnonzero(teammates)
+
+    def opponents(self, index):
+        """Returns the indices of the cars in the other team than the car with the given index"""
+        return np.flatnonzero(self.team != self.team[index])
@@ -0,0 +1,178 @@
+"""Module that builds the RLBot structs of a soccar match without the game running"""
+import sys
+from pathlib import Path
+
+from rlbot.utils.structures.ball_prediction_struct import BallPrediction as BallPredictionPacket
+from rlbot.utils.structures.game_data_struct import GameTickPacket, FieldInfoPacket
+
+from rlutilities.linear_algebra import vec3
+from rlutilities.simulation import Ball, Game
+
+exercise_dir = Path(__file__).absolute().parent / 'exercises'
+# Soccar boost pads in the order RLBot sends them, sorted on y and then x
+big_pads = [(-3072, -4096), (3072, -4096), (-3584, 0), (3584, 0), (-3072, 4096), (3072, 4096)]
+small_pads = [(0, -4240), (-1792, -4184), (1792, -4184), (-940, -3308), (940, -3308), (0, -2816), (-3584, -2484),
+              (3584, -2484), (-1788, -2300), (1788, -2300), (-2048, -1036), (0, -1024), (2048, -1036), (-1024, 0),
+              (1024, 0), (-2048, 1036), (0, 1024), (2048, 1036), (-1788, 2300), (1788, 2300), (-3584, 2484),
+              (3584, 2484), (0, 2816), (-940, 3310), (940, 3308), (-1792, 4184), (1792, 4184), (0, 4240)]
+boost_pads = sorted([(x, y, True) for x, y in big_pads] + [(x, y, False) for x, y in small_pads],
+                    key=lambda pad: (pad[1], pad[0]))
+big_pad_height = 73
+small_pad_height = 70
+goal_y = 5120
+goal_z = 642.775
+goal_width = 1785.5
+goal_height = 642.775
+# Octane hitbox and its offset from the center of mass
+octane_hitbox = (118.01, 84.2, 36.16)
+octane_hitbox_offset = (13.88, 0, 20.75)
+ball_radius = 92.75
+# Ball prediction slices per second and the number of slices RLBot predicts
+prediction_fps = 60
+prediction_slices = 360
+
+
+def set_vector(vector, values):
+    """Sets the x, y and z of a ctypes Vector3"""
+    vector.x, vector.y, vector.z = values
+
+
+def make_field_info():
+    """Returns the field info of a soccar field"""
+    field_info = FieldInfoPacket()
+    field_info.num_boosts = len(boost_pads)
+    for i, (x, y, is_full_boost) in enumerate(boost_pads):
+        set_vector(field_info.boost_pads[i].location, (x, y, big_pad_height if is_full_boost else small_pad_height))
+        field_info.boost_pads[i].is_full_boost = is_full_boost
+    field_info.num_goals = 2
+    for team in range(2):
+        goal = field_info.goals[team]
+        goal.team_num = team
+        set_vector(goal.location, (0, (2 * team - 1) * goal_y, goal_z))
+        set_vector(goal.direction, (0, 1 - 2 * team, 0))
+        goal.width = goal_width
+        goal.height = goal_height
+    return field_info
+
+
+def set_physics(physics, state):
+    """Copies the set values of a game state Physics into a ctypes Physics"""
+    if state is None:
+        return
+    for name in ['location', 'velocity', 'angular_velocity']:
+        vector = getattr(state, name)
+        if vector is not None:
+            target = getattr(physics, name)
+            for axis in 'xyz':
+                if getattr(vector, axis) is not None:
+                    setattr(target, axis, getattr(vector, axis))
+    if state.rotation is not None:
+        for axis in ['pitch', 'yaw', 'roll']:
+            if getattr(state.rotation, axis) is not None:
+                setattr(physics.rotation, axis, getattr(state.rotation, axis))
+
+
+def make_packet(game_state, teams, seconds_elapsed=0.0, packet=None):
+    """Applies a game state like the ones of the exercises to a packet, cars get the team in teams at their index.
+    Without a packet a new one is made with the ball at the center and every pad active"""
+    if packet is None:
+        packet = GameTickPacket()
+        packet.num_cars = len(teams)
+        for index, team in enumerate(teams):
+            car = packet.game_cars[index]
+            car.team = team
+            car.name = f'Headless {index}'
+            car.is_bot = True
+            car.has_wheel_contact = True
+            car.boost = 33
+            set_vector(car.physics.location, (0, 0, 17))
+            car.hitbox.length, car.hitbox.width, car.hitbox.height = octane_hitbox
+            set_vector(car.hitbox_offset, octane_hitbox_offset)
+        set_vector(packet.game_ball.physics.location, (0, 0, ball_radius))
+        packet.num_boost = len(boost_pads)
+        for i in range(len(boost_pads)):
+            packet.game_boosts[i].is_active = True
+        packet.num_teams = 2
+        for team in range(2):
+            packet.teams[team].team_index = team
+        packet.game_info.is_round_active = True
+        packet.game_info.is_unlimited_time = True
+        packet.game_info.world_gravity_z = -650
+        packet.game_info.game_speed = 1
+    packet.game_info.seconds_elapsed = seconds_elapsed
+    if game_state.ball is not None:
+        set_physics(packet.game_ball.physics, game_state.ball.physics)
+    for index, car_state in (game_state.cars or {}).items():
+        if index >= packet.num_cars:
+            continue
+        car = packet.game_cars[index]
+        set_physics(car.physics, car_state.physics)
+        if car_state.boost_amount is not None:
+            car.boost = int(car_state.boost_amount)
+        if car_state.jumped is not None:
+            car.jumped = car_state.jumped
+        if car_state.double_jumped is not None:
+            car.double_jumped = car_state.double_jumped
+    for index, boost_state in (game_state.boosts or {}).items():
+        if index < packet.num_boost and boost_state.respawn_time is not None:
+            packet.game_boosts[index].is_active = boost_state.respawn_time <= 0
+            packet.game_boosts[index].timer = 0
+    packet.game_info.is_kickoff_pause = at_kickoff(packet)
+    return packet
+
+
+def at_kickoff(packet):
+    """Returns whether the ball lies still at the center of the field like it does before a kickoff"""
+    physics = packet.game_ball.physics
+    return abs(physics.location.x) < 1 and abs(physics.location.y) < 1 and \
+        abs(physics.velocity.x) + abs(physics.velocity.y) + abs(physics.velocity.z) < 1
+
+
+def ball_from_packet(packet):
+    """Returns an RLUtilities ball with the state of the ball in the packet"""
+    Game.set_mode('soccar')
+    physics = packet.game_ball.physics
+    ball = Ball()
+    ball.position = vec3(physics.location.x, physics.location.y, physics.location.z)
+    ball.velocity = vec3(physics.velocity.x, physics.velocity.y, physics.velocity.z)
+    ball.angular_velocity = vec3(physics.angular_velocity.x, physics.angular_velocity.y, physics.angular_velocity.z)
+    ball.time = packet.game_info.seconds_elapsed
+    return ball
+
+
+def predict_ball(ball, num_slices=prediction_slices, ball_prediction=None):
+    """Fills a ball prediction struct by stepping a copy of the RLUtilities ball at 60 fps, the first slice is the
+    current state"""
+    if ball_prediction is None:
+        ball_prediction = BallPredictionPacket()
+    start = ball.time
+    ball = Ball(ball)
+    ball_prediction.num_slices = num_slices
+    for i in range(num_slices):
+        if i > 0:
+            ball.step(1 / prediction_fps)
+        physics = ball_prediction.slices[i].physics
+        set_vector(physics.location, (ball.position[0], ball.position[1], ball.position[2]))
+        set_vector(physics.velocity, (ball.velocity[0], ball.velocity[1], ball.velocity[2]))
+        set_vector(physics.angular_velocity, (ball.angular_velocity[0], ball.angular_velocity[1],
+                                              ball.angular_velocity[2]))
+        ball_prediction.slices[i].game_seconds = start + i / prediction_fps
+    return ball_prediction
+
+
+def default_exercises():
+    """Returns the exercises of the bounce shot, dribble and kickoff playlists"""
+    if str(exercise_dir) not in sys.path:
+        sys.path.append(str(exercise_dir))
+    import bounce_shots
+    import dribble_exercise
+    import kickoff_exercise
+    return bounce_shots.make_default_playlist() + dribble_exercise.make_default_playlist() + \
+        kickoff_exercise.make_default_playlist()
+
+
+def exercise_teams(exercise, game_state):
+    """Returns the team of every car of the exercise, cars without a player config alternate teams"""
+    teams = [int(config.team) for config in exercise.match_config.player_configs]
+    num_cars = max(list(game_state.cars or {}) + [len(teams) - 1]) + 1
+    return teams + [index % 2 for index in range(len(teams), num_cars)]
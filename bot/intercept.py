@@ -0,0 +1,105 @@
+"""Module that finds the earliest reachable ball prediction slice of every car at once"""
+import numpy as np
+
+# Driving constants
+throttle_acceleration = 1600
+max_throttle_speed = 1410
+boost_acceleration = 991.666
+max_speed = 2300
+boost_consumption = 33.3
+# How fast the throttle acceleration falls off with speed
+throttle_falloff = throttle_acceleration / max_throttle_speed
+# Maximum curvature of a turn at a given speed
+curvature_speeds = np.array([0, 500, 1000, 1500, 1750, 2300])
+curvatures = np.array([0.0069, 0.00398, 0.00235, 0.001375, 0.0011, 0.00088])
+# Slowest speed we use to estimate the turning rate, since cars accelerate while turning
+min_turn_speed = 500
+# Distance from the center of the car to the center of the ball when we touch it
+reach_radius = 150
+# Times checked on the ball trajectory between the intercept slice and the slice before it
+refine_samples = 4
+
+
+def drive_distance(t, initial_speed, boost):
+    """Returns the distance driven in a straight line after t seconds of full throttle while boosting until the boost
+    runs out, works on numpy arrays"""
+    boost_time = boost / boost_consumption
+    boosting_speed = np.maximum(max_throttle_speed + boost_acceleration / throttle_falloff, initial_speed)
+    boosting = np.minimum(t, boost_time)
+    distance = accelerate_distance(boosting, initial_speed, boosting_speed)
+    speed = accelerate_speed(boosting, initial_speed, boosting_speed)
+    # Without boost the throttle keeps us at our speed when we are faster than the max throttle speed
+    throttle_speed = np.maximum(max_throttle_speed, speed)
+    distance += accelerate_distance(np.maximum(t - boost_time, 0), speed, throttle_speed)
+    return distance
+
+
+def accelerate_distance(t, initial_speed, final_speed):
+    """Returns the distance driven when the speed approaches the final speed exponentially"""
+    return final_speed * t - (final_speed - initial_speed) * (1 - np.exp(-throttle_falloff * t)) / throttle_falloff
+
+
+def accelerate_speed(t, initial_speed, final_speed):
+    """Returns the speed after t seconds when the speed approaches the final speed exponentially"""
+    return np.minimum(final_speed - (final_speed - initial_speed) * np.exp(-throttle_falloff * t), max_speed)
+
+
+def turn_time(angle, speed):
+    """Returns the time needed to turn a certain angle while driving at a speed"""
+    speed = np.maximum(speed, min_turn_speed)
+    return angle / (speed * np.interp(speed, curvature_speeds, curvatures))
+
+
+def reach_mask(positions, velocities, forwards, boosts, targets, times):
+    """Returns a (cars, targets) boolean array of whether every car can get to every target before its time"""
+    car_to_target = targets[None, :, :2] - positions[:, None, :2]
+    distance = np.linalg.norm(car_to_target, axis=2)
+    forward = forwards[:, :2] / np.maximum(np.linalg.norm(forwards[:, :2], axis=1), 1e-10)[:, None]
+    cos_angle = np.sum(car_to_target * forward[:, None, :], axis=2) / np.maximum(distance, 1e-10)
+    angle = np.arccos(np.clip(cos_angle, -1, 1))
+    speed = np.maximum(np.sum(velocities[:, :2] * forward, axis=1), 0)[:, None]
+    drive_time = times[None, :] - turn_time(angle, speed)
+    reachable = drive_distance(np.maximum(drive_time, 0), speed, boosts[:, None]) >= distance - reach_radius
+    return (distance <= reach_radius) | ((drive_time > 0) & reachable)
+
+
+class Intercepts:
+    """Class that holds the earliest reachable ball prediction slice of every car for the current tick"""
+
+    def __init__(self, positions, velocities, forwards, boosts, ball_prediction):
+        self.ball_prediction = ball_prediction
+        self.cars = positions, velocities, forwards, boosts
+        self.refined = {}
+        if ball_prediction.num_slices == 0:
+            self.reachable = np.zeros((len(positions), 0), bool)
+            self.found = np.zeros(len(positions), bool)
+            self.index = np.zeros(len(positions), int)
+            self.time = np.zeros(len(positions))
+            return
+        self.reachable = reach_mask(positions, velocities, forwards, boosts, ball_prediction.position,
+                                    ball_prediction.time_until)
+        self.found = self.reachable.any(axis=1)
+        # Cars that can't reach the ball in the prediction go for its last slice
+        self.index = np.where(self.found, self.reachable.argmax(axis=1), ball_prediction.num_slices - 1)
+        self.time = ball_prediction.time_until[self.index]
+
+    def refined_time(self, index):
+        """Returns the earliest time a car can reach the ball between its intercept slice and the slice before it,
+        found on the interpolated trajectory of the ball"""
+        if index not in self.refined:
+            slice_index = self.index[index]
+            time = self.time[index]
+            if self.found[index] and slice_index > 0:
+                times = np.linspace(self.ball_prediction.time_until[slice_index - 1], time, refine_samples + 2)[1:]
+                car = tuple(array[index:index + 1] for array in self.cars)
+                reachable = reach_mask(*car, self.ball_prediction.trajectory.position_at(times), times)[0]
+                # The last time is the intercept slice itself, so there always is a reachable time
+                time = times[reachable.argmax()]
+            self.refined[index] = float(time)
+        return self.refined[index]
+
+    def location(self, index):
+        """Returns the intercept location of a car at its refined time as a vec3"""
+        if not self.found[index]:
+            return self.ball_prediction.location(self.index[index])
+        return self.ball_prediction.trajectory.location_at(self.refined_time(index))
@@ -0,0 +1,126 @@
+"""Module that searches for jump shots on numpy arrays instead of stepping a simulated car"""
+import numpy as np
+
+import kernels
+from contact import ball_radius, hitbox_contact
+from jump_sim import get_jump_trajectory, ramp, a as jump_acceleration, d as jump_acceleration_time
+
+# Ball prediction slices per second
+fps = 60
+max_duration = 1.4
+
+
+def jump_shot(position, velocity, orientation, boost, ball_locations, hitbox, durations=None):
+    """Checks all the jump durations at once and returns whether we can hit the ball, the time of the hit and the
+    location of the ball at that time.
+    position, velocity and orientation are the numpy versions of the car state, ball_locations contains the ball
+    prediction locations at 60 fps starting now and hitbox is the half width and offset of car_hitbox. durations limits the search to some slice times, by default every
+    slice time up to the max duration is tried"""
+    if durations is None:
+        num_slices = min(len(ball_locations), round(fps * max_duration) + 1)
+    else:
+        durations = np.sort(durations[(durations > 0) & (durations <= max_duration + 1e-6)])
+        if len(durations) == 0:
+            return False, None, None
+        num_slices = min(len(ball_locations), round(fps * durations[-1]) + 1)
+    if num_slices < 2:
+        return False, None, None
+    # Time of every slice and the durations we try, the dodge of a duration is at the last slice it covers
+    times = np.arange(1, num_slices) / fps
+    if durations is None:
+        durations = times
+    ball = ball_locations[1:num_slices]
+    # The elevation from the car to the ball determines how much of the boost goes up and how much goes forward
+    car_to_ball = ball_locations[0] - position
+    theta = np.arctan2(car_to_ball[2], max(np.linalg.norm(car_to_ball[:2]), 1e-10))
+    forward = orientation[:, 0].copy()
+    forward[2] = 0
+    forward /= max(np.linalg.norm(forward), 1e-10)
+
+    # Durations longer than the jump acceleration time give the same trajectory so we only compute unique holds
+    holds = np.minimum(durations, jump_acceleration_time)
+    candidate = reach_candidates(position, velocity, orientation, forward, theta, boost, times, holds[0], holds[-1],
+                                 ball, hitbox)
+    prune_stats.add(candidate, len(durations) - np.searchsorted(durations, times - 1e-6))
+    if not candidate.any():
+        return False, None, None
+    holds, trajectory = np.unique(holds, return_inverse=True)
+    z, xy = get_jump_trajectory(times[None, candidate], holds[:, None], theta, boost)
+    car = position + times[candidate, None] * velocity
+    car = np.broadcast_to(car, z.shape + (3,)).copy()
+    car[..., 2] += z
+    car[..., :2] += xy[..., None] * forward[:2]
+
+    touching = np.zeros((len(holds), len(times)), bool)
+    good_hit = np.zeros((len(holds), len(times)), bool)
+    touching[:, candidate], good_hit[:, candidate] = hitbox_contact(car, orientation, hitbox, ball[candidate])
+    touching, good_hit = touching[trajectory], good_hit[trajectory]
+    # We only look at the slices before the dodge of every duration
+    touching &= times[None, :] <= durations[:, None] + 1e-6
+    touched = touching.any(axis=1)
+    if not touched.any():
+        return False, None, None
+    # Like the car, every duration stops at its first touch and only counts when that touch is a good hit
+    first_touch = touching.argmax(axis=1)
+    successful = touched & good_hit[np.arange(len(durations)), first_touch]
+    if not successful.any():
+        return False, None, None
+    slice_index = first_touch[successful.argmax()]
+    return True, times[slice_index], ball[slice_index]
+
+
+def reach_candidates(position, velocity, orientation, forward, theta, boost, times, shortest_hold, longest_hold,
+                     ball_locations, hitbox):
+    """Returns for every slice whether any hold from the shortest to the longest can bring the hitbox to the ball.
+    The horizontal path doesn't depend on the hold and the height grows with it, so the hitbox centers of all holds
+    lie on a vertical segment between the shortest and the longest hold. A slice is out of reach when the ball is
+    further from that segment than the ball radius plus the radius of the sphere around the hitbox"""
+    half_width, offset = hitbox
+    reach_radius = ball_radius + np.linalg.norm(half_width)
+    # Without holding jump, the hold only adds the jump acceleration on top
+    z, xy = get_jump_trajectory(times, 0, theta, boost)
+    center = position + times[:, None] * velocity + orientation @ offset
+    center[:, :2] += xy[:, None] * forward[:2]
+    center[:, 2] += z
+    to_ball = ball_locations - center
+    below = to_ball[:, 2] - jump_acceleration * ramp(times, longest_hold)
+    above = jump_acceleration * ramp(times, shortest_hold) - to_ball[:, 2]
+    vertical = np.maximum(np.maximum(below, above), 0)
+    return to_ball[:, 0] ** 2 + to_ball[:, 1] ** 2 + vertical ** 2 <= reach_radius ** 2
+
+
+class PruneStats:
+    """Class that counts the (duration, slice) pairs the reach check rejected before the contact test"""
+
+    def __init__(self):
+        self.pairs = 0
+        self.pruned = 0
+
+    def add(self, candidate, pairs):
+        """Counts the pairs of a search, pairs holds the number of durations that reach every slice"""
+        self.pairs += int(pairs.sum())
+        self.pruned += int(pairs[~candidate].sum())
+
+    @property
+    def fraction(self):
+        """Fraction of the pairs that got pruned"""
+        return self.pruned / self.pairs if self.pairs > 0 else 0.0
+
+    def reset(self):
+        self.pairs = 0
+        self.pruned = 0
+
+
+prune_stats = PruneStats()
+
+
+def warm_up():
+    """Loads the kernels and runs a search that hits a ball hanging in front of a resting car, so every part of the
+    search has run once. The prune statistics don't count it"""
+    kernels.warm_up()
+    ball_locations = np.tile([200, 0, 200], (round(fps * max_duration) + 1, 1)).astype(np.float32)
+    # Any hitbox runs the same code
+    hitbox = np.array([60.0, 40.0, 15.0]), np.zeros(3)
+    jump_shot(np.array([0, 0, 17.0]), np.zeros(3), np.eye(3), 50, ball_locations, hitbox)
+    prune_stats.reset()
+
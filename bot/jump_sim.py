@@ -2,8 +2,7 @@ import math
 import sys
 from pathlib import Path
 
-import scipy
-from pynverse import inversefunc
+import numpy as np
 
 sys.path.insert(1, str(Path(__file__).absolute().parent.parent.parent))
 
@@ -16,6 +15,10 @@ d = 0.2
 
 batmobile_resting_height = 18.65
 boost_acceleration = 991.666
+# initial vertical velocity of a jump
+jump_impulse = 300
+# boost used per second
+boost_consumption = 33.3
 
 
 # Functions which calculates the height of your jump at time x with duration of d
@@ -31,17 +34,6 @@ def get_height_at_time(x):
     return 0
 
 
-# The inverse of the function above, so it gives the time at which you will reach height h with duration d
-def get_time_at_height(y):
-    f = lambda x: get_height_at_time(x)
-    f_max = min(scipy.optimize.fmin(lambda x: -f(x), 0, disp=False), 1.4)
-    f_inverse = inversefunc(f, domain=[0, f_max])
-    if y < f_max:
-        return f_inverse(y)
-    else:
-        return f_max
-
-
 def get_height_at_time_boost(x, theta, boost_amount):
     """Get the height of a jump at a certain time t while boosting at angle theta for a given boost amount"""
     b = math.sin(theta) * boost_acceleration
@@ -59,12 +51,17 @@ def get_height_at_time_boost(x, theta, boost_amount):
         return batmobile_resting_height + 0.5 * (-g) * ((x - b_t) ** 2) + a3 * (x - b_t) + p
 
 
-# The inverse of the function above, so it gives the time at which you will reach height h with duration d
-def get_time_at_height_boost(y, theta, boost_amount):
-    f = lambda x: get_height_at_time_boost(x, theta, boost_amount)
-    f_max = min(scipy.optimize.fmin(lambda x: -f(x), 0, disp=False)[0], 1.4)
-    f_inverse = inversefunc(f, domain=[0, f_max])
-    if y < f(f_max):
-        return f_inverse(y)
-    else:
-        return f_max
+def ramp(x, duration):
+    """Returns the displacement at time x caused by a unit acceleration that is active for the first duration seconds"""
+    active = np.minimum(x, duration)
+    return 0.5 * active ** 2 + duration * np.maximum(x - duration, 0)
+
+
+def get_jump_trajectory(x, hold, theta, boost_amount):
+    """Get the vertical and horizontal displacement at times x of a jump held for hold seconds while boosting at angle
+    theta, works on numpy arrays and broadcasts all the arguments against each other"""
+    boost_time = np.maximum(boost_amount, 0) / boost_consumption
+    z = jump_impulse * x - 0.5 * g * x ** 2 + a * ramp(x, np.minimum(hold, d)) \
+        + np.sin(theta) * boost_acceleration * ramp(x, boost_time)
+    xy = np.cos(theta) * boost_acceleration * ramp(x, boost_time)
+    return z, xy
@@ -0,0 +1,132 @@
+"""Module with lookup tables for the time at which a jump reaches a certain height"""
+from pathlib import Path
+
+import numpy as np
+
+from jump_sim import get_jump_trajectory, batmobile_resting_height, d
+
+table_path = Path(__file__).absolute().parent / 'jump_table.npz'
+# Bump the version whenever the jump model or the grids change so old tables get regenerated
+table_version = 2
+max_time = 1.4
+time_step = 1 / 1200
+# Heights this close to the apex are left out of the accuracy check
+apex_margin = 20
+
+heights = np.linspace(0, 2048, 129)
+thetas = np.linspace(-np.pi / 2, np.pi / 2, 37)
+boosts = np.linspace(0, 100, 26)
+
+
+class JumpTable:
+    """Class that answers the time at which a jump reaches a height by interpolating precomputed tables"""
+
+    def __init__(self, times, times_no_boost):
+        self.times = times
+        self.times_no_boost = times_no_boost
+
+    @classmethod
+    def generate(cls):
+        """Generates the tables by inverting the rising part of every jump trajectory"""
+        t = np.arange(0, max_time + time_step / 2, time_step)
+        z = jump_height(t, thetas[:, None, None], boosts[None, :, None])
+        times = np.empty((len(heights), len(thetas), len(boosts)))
+        for i in range(len(thetas)):
+            for j in range(len(boosts)):
+                times[:, i, j] = invert_rising(t, z[i, j], heights)
+        times_no_boost = invert_rising(t, jump_height(t, 0, 0), heights)
+        return cls(times, times_no_boost)
+
+    @classmethod
+    def load(cls, path=table_path):
+        """Loads the tables from disk, they get generated and saved the first time"""
+        if path.exists():
+            with np.load(path) as data:
+                if data['version'] == table_version:
+                    return cls(data['times'], data['times_no_boost'])
+        table = cls.generate()
+        table.save(path)
+        return table
+
+    def save(self, path=table_path):
+        """Saves the tables to disk"""
+        np.savez(path, version=table_version, times=self.times, times_no_boost=self.times_no_boost)
+
+    def time_at_height(self, height):
+        """Returns the time at which a jump without boost reaches the height, or the time of its apex"""
+        return np.interp(height, heights, self.times_no_boost)
+
+    def time_at_height_boost(self, height, theta, boost_amount):
+        """Returns the time at which a jump while boosting at angle theta reaches the height, or the time of its apex.
+        All arguments can be arrays and are broadcast against each other"""
+        height, theta, boost_amount = np.broadcast_arrays(height, theta, boost_amount)
+        i, i_t = grid_index(heights, height)
+        j, j_t = grid_index(thetas, theta)
+        k, k_t = grid_index(boosts, boost_amount)
+        result = 0
+        # Trilinear interpolation over the 8 corners of the cell
+        for di, wi in ((0, 1 - i_t), (1, i_t)):
+            for dj, wj in ((0, 1 - j_t), (1, j_t)):
+                for dk, wk in ((0, 1 - k_t), (1, k_t)):
+                    result = result + wi * wj * wk * self.times[i + di, j + dj, k + dk]
+        return result
+
+    def reaches(self, height, theta, boost_amount):
+        """Returns whether a jump while boosting at angle theta gets to the height before its apex or the end of the
+        table, works on arrays like time_at_height_boost"""
+        return self.time_at_height_boost(height, theta, boost_amount) < \
+            self.time_at_height_boost(heights[-1], theta, boost_amount) - time_step
+
+    def check_accuracy(self, samples=5000, seed=0):
+        """Returns the maximum and mean height error of the tables compared to the jump trajectory they are made of.
+        Heights close to the apex are skipped since the time there is barely defined by the height"""
+        rng = np.random.default_rng(seed)
+        height = rng.uniform(batmobile_resting_height, 800, samples)
+        theta = rng.uniform(thetas[0], thetas[-1], samples)
+        boost_amount = rng.uniform(boosts[0], boosts[-1], samples)
+        apex = jump_height(self.time_at_height_boost(heights[-1], theta, boost_amount), theta, boost_amount)
+        below_apex = height < apex - apex_margin
+        errors = np.abs(jump_height(self.time_at_height_boost(height, theta, boost_amount), theta, boost_amount) -
+                        height)[below_apex]
+        apex = jump_height(self.time_at_height(heights[-1]), 0, 0)
+        below_apex = height < apex - apex_margin
+        errors = np.concatenate((errors, np.abs(jump_height(self.time_at_height(height), 0, 0) - height)[below_apex]))
+        return errors.max(), errors.mean()
+
+
+def jump_height(t, theta, boost_amount):
+    """Returns the height of the car at times t of a full jump while boosting at angle theta, the jump of the jump shot
+    search"""
+    z, _ = get_jump_trajectory(t, d, theta, boost_amount)
+    return z + batmobile_resting_height
+
+
+def invert_rising(t, z, targets):
+    """Returns the first time the heights z reach each target, or the time of the apex when they don't"""
+    apex = np.argmax(z)
+    return np.interp(targets, z[:apex + 1], t[:apex + 1])
+
+
+def grid_index(grid, values):
+    """Returns the lower cell index and the fraction within the cell for values on an evenly spaced grid"""
+    position = np.clip((values - grid[0]) / (grid[1] - grid[0]), 0, len(grid) - 1)
+    index = np.minimum(position.astype(int), len(grid) - 2)
+    return index, position - index
+
+
+_jump_table = None
+
+
+def get_jump_table():
+    """Returns the jump table, loading it the first time"""
+    global _jump_table
+    if _jump_table is None:
+        _jump_table = JumpTable.load()
+    return _jump_table
+
+
+if __name__ == '__main__':
+    jump_table = JumpTable.generate()
+    jump_table.save()
+    max_error, mean_error = jump_table.check_accuracy()
+    print(f'Saved {table_path}, max height error {max_error:.2f}uu, mean height error {mean_error:.3f}uu')
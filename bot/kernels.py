@@ -0,0 +1,208 @@
+"""Module with numba compiled kernels for the hot geometry, they work on plain float arrays and are cached on disk.
+numba is only imported once the kernels are loaded, by load or by the first call of a kernel"""
+from functools import wraps
+
+import numpy as np
+
+# How far the ball can be above or below the hit location for a good hit
+good_hit_height = 25
+# Hit classes of trajectory_contact, under means the ball is above the contact point and gets lifted
+hit_none = 0
+hit_good = 1
+hit_under = 2
+hit_over = 3
+# Targets are kept this far from the side walls
+max_target_x = 3850
+
+_functions = []
+_loaded = False
+
+
+def kernel(function):
+    """Decorator that leaves the function to be compiled by load, calling it before that loads the kernels first"""
+    _functions.append(function)
+
+    @wraps(function)
+    def load_and_call(*args):
+        load()
+        return globals()[function.__name__](*args)
+
+    return load_and_call
+
+
+def load():
+    """Imports numba and swaps every kernel for its compiled version. Kernels call each other through the module
+    globals, so all of them are swapped before the first one compiles. They release the GIL since the jump shot
+    search calls them on the worker thread while the tick thread keeps running"""
+    global _loaded
+    if _loaded:
+        return
+    from numba import njit
+    for function in _functions:
+        globals()[function.__name__] = njit(cache=True, nogil=True)(function)
+    _loaded = True
+
+
+@kernel
+def obb_sphere_contact(car_positions, orientation, half_width, offset, ball_locations, ball_radius):
+    """Returns two (holds, slices) boolean arrays of whether the hitbox touches the ball and whether that touch is a
+    good hit. car_positions is (holds, slices, 3), ball_locations is (slices, 3) and the hitbox is oriented by the
+    columns of orientation with its center at the offset from the car position"""
+    holds, slices = car_positions.shape[0], car_positions.shape[1]
+    touching = np.zeros((holds, slices), np.bool_)
+    good_hit = np.zeros((holds, slices), np.bool_)
+    # Written out since the matrix product of numba needs scipy
+    center_offset = np.zeros(3)
+    for m in range(3):
+        for k in range(3):
+            center_offset[m] += orientation[m, k] * offset[k]
+    for i in range(holds):
+        for j in range(slices):
+            # Closest point of the hitbox to the ball, found in the local coordinates of the hitbox
+            distance = 0.0
+            hit_z = car_positions[i, j, 2] + center_offset[2]
+            for k in range(3):
+                local = 0.0
+                for m in range(3):
+                    local += (ball_locations[j, m] - car_positions[i, j, m] - center_offset[m]) * orientation[m, k]
+                closest = min(max(local, -half_width[k]), half_width[k])
+                # Hit location minus ball location along this axis of the hitbox
+                distance += (closest - local) ** 2
+                hit_z += closest * orientation[2, k]
+            touching[i, j] = distance <= ball_radius ** 2
+            good_hit[i, j] = abs(ball_locations[j, 2] - hit_z) < good_hit_height
+    return touching, good_hit
+
+
+@kernel
+def trajectory_contact(car_positions, orientations, half_width, offset, ball_positions, ball_radius):
+    """Returns the first index where the hitbox of the (n, 3) car positions and (n, 3, 3) orientations touches the
+    (n, 3) ball positions, the contact point in the local coordinates of the car and the hit class of that touch.
+    The index is -1 and the hit class is hit_none when they never touch"""
+    for i in range(car_positions.shape[0]):
+        center = np.zeros(3)
+        for m in range(3):
+            center[m] = car_positions[i, m]
+            for k in range(3):
+                center[m] += orientations[i, m, k] * offset[k]
+        local_point = np.zeros(3)
+        distance = 0.0
+        for k in range(3):
+            local = 0.0
+            for m in range(3):
+                local += (ball_positions[i, m] - center[m]) * orientations[i, m, k]
+            closest = min(max(local, -half_width[k]), half_width[k])
+            distance += (closest - local) ** 2
+            local_point[k] = closest
+        if distance > ball_radius ** 2:
+            continue
+        hit_z = center[2]
+        for k in range(3):
+            hit_z += orientations[i, 2, k] * local_point[k]
+            local_point[k] += offset[k]
+        height = ball_positions[i, 2] - hit_z
+        if abs(height) < good_hit_height:
+            return i, local_point, hit_good
+        return i, local_point, hit_under if height > 0 else hit_over
+    return -1, np.zeros(3), hit_none
+
+
+@kernel
+def backline_intersect(y_axis, origin_x, origin_y, direction_x, direction_y):
+    """Returns the x where the ray from the origin in the direction crosses the line y = y_axis"""
+    if abs(direction_y) < 1e-10:
+        direction_y = 1e-10
+    return origin_x + (y_axis - origin_y) / direction_y * direction_x
+
+
+@kernel
+def normalize(vector):
+    """Returns the vector with length 1, the zero vector stays zero"""
+    length = np.sqrt(np.sum(vector ** 2))
+    if length < 1e-10:
+        return vector * 0.0
+    return vector / length
+
+
+@kernel
+def cap(num, low, high):
+    return min(max(num, low), high)
+
+
+@kernel
+def distance_2d(a, b):
+    return np.sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2)
+
+
+@kernel
+def offset_target(ball_position, ball_velocity, car_position, direction, error, team_sign):
+    """Places the target behind the ball along the direction, further away the bigger the error, and corrects it for
+    the ball velocity perpendicular to the direction and for the side walls"""
+    # The direction rotated by 90 degrees
+    test_x, test_y = -direction[1], direction[0]
+    distance = cap((40 + distance_2d(ball_position, car_position) * error ** 2) / 1.8, 0.0, 4000.0)
+    location = ball_position.copy()
+    location[0] += direction[0] * distance
+    location[1] += direction[1] * distance
+
+    multiplier = cap(distance_2d(car_position, location) / 1500, 0.0, 2.0)
+    distance_modifier = cap((test_x * ball_velocity[0] + test_y * ball_velocity[1]) * multiplier, -1000.0, 1000.0)
+    location[0] += test_x * distance_modifier
+    location[1] += test_y * distance_modifier
+
+    extra = max_target_x - abs(location[0])
+    if extra < 0:
+        location[0] = cap(location[0], -max_target_x, max_target_x)
+        location[1] = location[1] - team_sign * cap(extra, -800.0, 800.0)
+    return location
+
+
+@kernel
+def shooting_target(ball_position, ball_velocity, car_position, goal_center, left_corner, right_corner,
+                    team_sign):
+    """Returns the target of the shooting strategy, left_corner and right_corner are the corners of the goal we shoot
+    at with the lowest and the highest x"""
+    to_goal = goal_center.copy()
+    to_goal[1] -= 5120
+    to_goal[2] = 0
+    ball_target = ball_position + 200 * normalize(to_goal)
+    intersect = backline_intersect(goal_center[1], car_position[0], car_position[1],
+                                   ball_target[0] - car_position[0], ball_target[1] - car_position[1])
+    if abs(intersect) < 700:
+        goal_to_ball = normalize(car_position - ball_target)
+        error = 0.0
+    else:
+        target = left_corner.copy()
+        target[0] += 400
+        # Left of the ball
+        if intersect > 500:
+            target = right_corner.copy()
+            target[0] -= 400
+        goal_to_ball = normalize(ball_target - target)
+        difference = goal_to_ball - normalize(car_position - target)
+        error = cap(abs(difference[0]) + abs(difference[1]), 0.0, 5.0)
+    return offset_target(ball_target, ball_velocity, car_position, goal_to_ball, error, team_sign)
+
+
+@kernel
+def defending_target(ball_position, ball_velocity, car_position, goal_center, team_sign):
+    """Returns the target of the defending strategy, goal_center is the center of our own goal"""
+    intersect = backline_intersect(goal_center[1], car_position[0], car_position[1],
+                                   ball_position[0] - car_position[0], ball_position[1] - car_position[1])
+    target = goal_center.copy()
+    target[0] += (1.0 if intersect > 0 else -1.0) * max(abs(ball_position[0]), 1500.0)
+    target_to_ball = normalize(ball_position - target)
+    difference = target_to_ball - normalize(car_position - target)
+    error = cap(abs(difference[0]) + abs(difference[1]), 1.0, 10.0)
+    return offset_target(ball_position, ball_velocity, car_position, target_to_ball, error, team_sign)
+
+
+def warm_up():
+    """Compiles every kernel for the argument types the bot uses, or loads them from the disk cache"""
+    load()
+    vector = np.zeros(3)
+    obb_sphere_contact(np.zeros((1, 1, 3)), np.eye(3), np.ones(3), vector, np.zeros((1, 3)), 1.0)
+    trajectory_contact(np.zeros((1, 3)), np.eye(3).reshape(1, 3, 3), np.ones(3), vector, np.zeros((1, 3)), 1.0)
+    backline_intersect(0.0, 0.0, 0.0, 1.0, 1.0)
+    shooting_target(vector, vector, vector, vector, vector, vector, 1.0)
+    defending_target(vector, vector, vector, vector, 1.0)
@@ -0,0 +1,209 @@
+"""Module that plays the role of RLBot for the exercises by simulating the match locally as fast as possible"""
+import copy
+from collections import namedtuple
+from random import Random
+from time import perf_counter
+
+import numpy as np
+
+from rlbottraining.grading.training_tick_packet import TrainingTickPacket
+from rlbottraining.rng import SeededRandomNumberGenerator
+
+from boost import big_pad_respawn_time, small_pad_respawn_time, big_pad_boost, small_pad_boost
+from derevo import Hypebot
+from headless import make_field_info, make_packet, ball_from_packet, predict_ball, default_exercises, \
+    exercise_teams, set_vector, at_kickoff, boost_pads, goal_y, ball_radius
+from replay import replay_agent_class
+from rlutilities.linear_algebra import vec3, euler_to_rotation, rotation_to_euler
+from rlutilities.simulation import Car, Input, intersect
+
+tick_rate = 120
+# The ball prediction is refreshed at its own rate of 60 fps and after every touch
+prediction_interval = 2
+# Exercises that aren't graded after this many game seconds stop without a grade
+max_game_seconds = 60
+big_pad_radius = 208
+small_pad_radius = 144
+# Cars higher above the ground than this can't pick up boost
+pad_reach_height = 170
+
+LocalResult = namedtuple('LocalResult', ['exercise', 'seed', 'grade', 'game_seconds', 'wall_seconds',
+                                         'tick_times'])
+
+
+def car_from_packet(packet, index):
+    """Returns an RLUtilities car with the state of a car in the packet"""
+    packet_car = packet.game_cars[index]
+    physics = packet_car.physics
+    car = Car()
+    car.position = vec3(physics.location.x, physics.location.y, physics.location.z)
+    car.velocity = vec3(physics.velocity.x, physics.velocity.y, physics.velocity.z)
+    car.angular_velocity = vec3(physics.angular_velocity.x, physics.angular_velocity.y, physics.angular_velocity.z)
+    car.orientation = euler_to_rotation(vec3(physics.rotation.pitch, physics.rotation.yaw, physics.rotation.roll))
+    car.boost = packet_car.boost
+    car.on_ground = packet_car.has_wheel_contact
+    car.team = packet_car.team
+    car.id = index
+    car.time = packet.game_info.seconds_elapsed
+    return car
+
+
+def to_input(controls):
+    """Returns the RLUtilities input of the controls of a bot"""
+    car_input = Input()
+    car_input.throttle = float(controls.throttle)
+    car_input.steer = float(controls.steer)
+    car_input.pitch = float(controls.pitch)
+    car_input.yaw = float(controls.yaw)
+    car_input.roll = float(controls.roll)
+    car_input.jump = bool(controls.jump)
+    car_input.boost = bool(controls.boost)
+    car_input.handbrake = bool(controls.handbrake)
+    return car_input
+
+
+class LocalMatch:
+    """Class that runs an exercise without the game. The bots in the match config drive the first cars, the other
+    cars of the game state stay where they are. The ball and cars are stepped with RLUtilities at 120 fps"""
+
+    def __init__(self, exercise, seed=0, agent_class=Hypebot):
+        # Graders keep state while grading so every match gets its own copy of the exercise
+        self.exercise = copy.deepcopy(exercise)
+        self.seed = seed
+        game_state = self.exercise.make_game_state(SeededRandomNumberGenerator(Random(seed)))
+        teams = exercise_teams(self.exercise, game_state)
+        self.packet = make_packet(game_state, teams)
+        self.field_info = make_field_info()
+        self.time = 0.0
+        self.tick = 0
+        self.touched = False
+        self.ball = ball_from_packet(self.packet)
+        self.cars = [car_from_packet(self.packet, index) for index in range(len(teams))]
+        self.ball_prediction = None
+        self.agents = []
+        for index in range(len(self.exercise.match_config.player_configs)):
+            agent = replay_agent_class(agent_class)(teams[index], index, self.field_info)
+            agent.async_simulation = False
+            agent.render_profile = False
+            agent.initialize_agent()
+            self.agents.append(agent)
+        self.pad_locations = np.array([(x, y) for x, y, _ in boost_pads], float)
+        full_boost = np.array([is_full_boost for _, _, is_full_boost in boost_pads])
+        self.pad_radius = np.where(full_boost, big_pad_radius, small_pad_radius)
+        self.pad_boost = np.where(full_boost, big_pad_boost, small_pad_boost)
+        self.pad_respawn_time = np.where(full_boost, big_pad_respawn_time, small_pad_respawn_time)
+        self.pad_active = np.array([self.packet.game_boosts[i].is_active for i in range(len(boost_pads))])
+        self.pad_timer = np.zeros(len(boost_pads))
+        self.tick_times = []
+
+    def step(self):
+        """Lets every bot play a tick and advances the match by one tick"""
+        dt = 1 / tick_rate
+        if self.tick % prediction_interval == 0 or self.touched:
+            self.ball_prediction = predict_ball(self.ball, ball_prediction=self.ball_prediction)
+        inputs = []
+        start = perf_counter()
+        for agent in self.agents:
+            agent.ball_prediction_struct = self.ball_prediction
+            inputs.append(to_input(agent.get_output(self.packet)))
+        self.tick_times.append(perf_counter() - start)
+        for car, car_input in zip(self.cars, inputs):
+            car.step(car_input, dt)
+        self.step_ball(dt)
+        self.pick_up_boost(dt)
+        self.time += dt
+        self.tick += 1
+        self.write_packet()
+
+    def step_ball(self, dt):
+        """Advances the ball, colliding it with the first controlled car that touches it and checking for goals"""
+        self.touched = False
+        for index, car in enumerate(self.cars[:len(self.agents)]):
+            if intersect(car.hitbox(), self.ball.hitbox()):
+                self.ball.step(dt, car)
+                self.touched = True
+                touch = self.packet.game_ball.latest_touch
+                touch.player_name = self.packet.game_cars[index].name
+                touch.player_index = index
+                touch.team = self.packet.game_cars[index].team
+                touch.time_seconds = self.time + dt
+                set_vector(touch.hit_location, (self.ball.position[0], self.ball.position[1], self.ball.position[2]))
+                break
+        else:
+            self.ball.step(dt)
+        if abs(self.ball.position[1]) > goal_y + ball_radius:
+            # Scoring in the orange goal at positive y is a goal for blue
+            scoring_team = 0 if self.ball.position[1] > 0 else 1
+            self.packet.teams[scoring_team].score += 1
+            self.ball.position = vec3(0, 0, ball_radius)
+            self.ball.velocity = vec3(0, 0, 0)
+            self.ball.angular_velocity = vec3(0, 0, 0)
+            self.touched = True
+
+    def pick_up_boost(self, dt):
+        """Respawns the boost pads whose timer ran out and lets the controlled cars pick up the active ones"""
+        self.pad_timer[~self.pad_active] += dt
+        respawned = ~self.pad_active & (self.pad_timer >= self.pad_respawn_time)
+        self.pad_active[respawned] = True
+        self.pad_timer[respawned] = 0
+        for car in self.cars[:len(self.agents)]:
+            if car.position[2] > pad_reach_height or car.boost >= 100:
+                continue
+            distance = np.hypot(self.pad_locations[:, 0] - car.position[0], self.pad_locations[:, 1] - car.position[1])
+            for pad in np.flatnonzero(self.pad_active & (distance < self.pad_radius)):
+                car.boost = min(car.boost + int(self.pad_boost[pad]), 100)
+                self.pad_active[pad] = False
+                self.pad_timer[pad] = 0
+
+    def write_packet(self):
+        """Writes the simulated state into the packet the bots and graders read"""
+        packet = self.packet
+        packet.game_info.seconds_elapsed = self.time
+        physics = packet.game_ball.physics
+        set_vector(physics.location, (self.ball.position[0], self.ball.position[1], self.ball.position[2]))
+        set_vector(physics.velocity, (self.ball.velocity[0], self.ball.velocity[1], self.ball.velocity[2]))
+        set_vector(physics.angular_velocity, (self.ball.angular_velocity[0], self.ball.angular_velocity[1],
+                                              self.ball.angular_velocity[2]))
+        for index, car in enumerate(self.cars[:len(self.agents)]):
+            packet_car = packet.game_cars[index]
+            physics = packet_car.physics
+            set_vector(physics.location, (car.position[0], car.position[1], car.position[2]))
+            set_vector(physics.velocity, (car.velocity[0], car.velocity[1], car.velocity[2]))
+            set_vector(physics.angular_velocity, (car.angular_velocity[0], car.angular_velocity[1],
+                                                  car.angular_velocity[2]))
+            rotation = rotation_to_euler(car.orientation)
+            physics.rotation.pitch, physics.rotation.yaw, physics.rotation.roll = rotation[0], rotation[1], rotation[2]
+            packet_car.has_wheel_contact = car.on_ground
+            packet_car.jumped = car.jumped
+            packet_car.double_jumped = car.double_jumped
+            packet_car.boost = int(car.boost)
+        for i in range(len(boost_pads)):
+            packet.game_boosts[i].is_active = bool(self.pad_active[i])
+            packet.game_boosts[i].timer = float(self.pad_timer[i])
+        packet.game_info.is_kickoff_pause = at_kickoff(packet)
+
+    def play(self, max_seconds=max_game_seconds):
+        """Runs the match until the grader of the exercise grades it or the time runs out"""
+        start = perf_counter()
+        grade = None
+        while grade is None and self.time < max_seconds:
+            self.step()
+            grade = self.exercise.grader.on_tick(TrainingTickPacket(self.packet))
+        for agent in self.agents:
+            agent.shot_worker.shutdown()
+        return LocalResult(self.exercise, self.seed, grade, self.time, perf_counter() - start,
+                           np.array(self.tick_times))
+
+
+def run_playlist(exercises, seed=0):
+    """Plays the exercises one after another like rlbottraining does, yielding a result per exercise"""
+    for exercise in exercises:
+        yield LocalMatch(exercise, seed).play()
+
+
+if __name__ == '__main__':
+    total = perf_counter()
+    for result in run_playlist(default_exercises()):
+        print(f'{result.exercise.name:<28} {str(result.grade):<60} graded after {result.game_seconds:5.2f}s '
+              f'in {result.wall_seconds:5.2f}s')
+    print(f'Playlist done in {perf_counter() - total:.2f}s')
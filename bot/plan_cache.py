@@ -0,0 +1,114 @@
+"""Module that reuses jump shot plans across ticks while the car and ball keep following the same paths"""
+from collections import Counter
+
+import numpy as np
+
+from jump_shot import jump_shot, fps
+
+# Grid sizes of the relative car and ball state in the cache key
+position_step = 50
+velocity_step = 100
+yaw_step = 0.05
+boost_step = 10
+# Distance the car or ball can be away from where the cached state said they would be before the cache is dropped
+max_car_error = 100
+max_ball_error = 50
+# Plans without a hit are searched again after this many seconds
+max_age = 0.25
+# Slices around the previous winning duration that get checked to revalidate a plan
+revalidation_window = 2
+
+
+class PlanCache:
+    """Class that remembers the last jump shot plan and the state it was made for.
+    A plan without a hit is reused while the quantized relative state stays the same, a plan with a hit is revalidated
+    by only trying the durations around its previous winning duration. Everything is searched again after a touch or a
+    state jump"""
+
+    def __init__(self):
+        self.plan = None
+        self.key = None
+        self.time = None
+        self.touch = None
+        self.position = None
+        self.velocity = None
+        self.ball_locations = None
+        self.outcomes = Counter()
+        self.invalidations = Counter()
+
+    def search(self, position, velocity, orientation, boost, ball_locations, hitbox, time, touch):
+        """Returns the jump shot plan like jump_shot does, using the cache when we can.
+        touch is anything that changes when someone touches the ball, like the latest touch of the packet"""
+        key = state_key(position, velocity, orientation, boost, ball_locations)
+        if self.plan is not None:
+            reason = self.invalidation(position, ball_locations, time, touch)
+            if reason is not None:
+                self.invalidations[reason] += 1
+                self.plan = None
+        if self.plan is not None:
+            can_dodge, duration, _ = self.plan
+            elapsed = time - self.time
+            if not can_dodge and key == self.key:
+                self.outcomes['hit'] += 1
+                return self.plan
+            if can_dodge:
+                window = round((duration - elapsed) * fps) + np.arange(-revalidation_window, revalidation_window + 1)
+                plan = jump_shot(position, velocity, orientation, boost, ball_locations, hitbox, window / fps)
+                if plan[0]:
+                    self.outcomes['revalidated'] += 1
+                    self.store(plan, key, position, velocity, ball_locations, time, touch)
+                    return plan
+        self.outcomes['miss'] += 1
+        plan = jump_shot(position, velocity, orientation, boost, ball_locations, hitbox)
+        self.store(plan, key, position, velocity, ball_locations, time, touch)
+        return plan
+
+    def invalidation(self, position, ball_locations, time, touch):
+        """Returns why the cached plan can't be used anymore, or None when it still can"""
+        elapsed = time - self.time
+        can_dodge, duration, _ = self.plan
+        if touch != self.touch:
+            return 'touch'
+        if elapsed < 0 or elapsed >= (duration if can_dodge else max_age):
+            return 'expired'
+        if np.linalg.norm(position - (self.position + elapsed * self.velocity)) > max_car_error:
+            return 'car jump'
+        index = min(round(elapsed * fps), len(self.ball_locations) - 1)
+        if len(ball_locations) == 0 or np.linalg.norm(ball_locations[0] - self.ball_locations[index]) > max_ball_error:
+            return 'ball jump'
+        return None
+
+    def store(self, plan, key, position, velocity, ball_locations, time, touch):
+        """Remembers a plan with the state it was made for"""
+        self.plan = plan
+        self.key = key
+        self.time = time
+        self.touch = touch
+        self.position = position
+        self.velocity = velocity
+        self.ball_locations = ball_locations[:round(fps * max(max_age, plan[1] or 0)) + 1]
+
+    @property
+    def hit_rate(self):
+        """Fraction of the searches that reused or revalidated a cached plan"""
+        searches = sum(self.outcomes.values())
+        return (self.outcomes['hit'] + self.outcomes['revalidated']) / searches if searches > 0 else 0.0
+
+    def report(self):
+        """Returns lines with the hit rate, the outcomes and the invalidation reasons"""
+        lines = [f'plan cache hit rate: {self.hit_rate:.1%}']
+        lines += [f'  {outcome}: {count}' for outcome, count in self.outcomes.most_common()]
+        lines += [f'  invalidated by {reason}: {count}' for reason, count in self.invalidations.most_common()]
+        return lines
+
+
+def state_key(position, velocity, orientation, boost, ball_locations):
+    """Returns the quantized state of the ball relative to the car"""
+    if len(ball_locations) < 2:
+        return None
+    ball_velocity = (ball_locations[1] - ball_locations[0]) * fps
+    yaw = np.arctan2(orientation[1, 0], orientation[0, 0])
+    return (tuple(np.round((ball_locations[0] - position) / position_step).astype(int)),
+            tuple(np.round(velocity / velocity_step).astype(int)),
+            tuple(np.round(ball_velocity / velocity_step).astype(int)),
+            round(yaw / yaw_step), int(boost // boost_step))
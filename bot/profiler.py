@@ -0,0 +1,92 @@
+"""Module that times the stages of every tick and keeps rolling percentiles per step"""
+import csv
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from time import perf_counter
+
+import numpy as np
+
+tick_rate = 120
+stages = ['state read', 'boost update', 'predict', 'intercept', 'strategy', 'dodge sim', 'aerial plan', 'render', 'record']
+
+
+class TickProfiler:
+    """Class that times the stages of every tick, stages started inside another stage are part of that stage too"""
+
+    def __init__(self, window=1200, summary_interval=60):
+        self.window = window
+        self.summary_interval = summary_interval
+        self.samples = defaultdict(lambda: deque(maxlen=window))
+        self.current = defaultdict(float)
+        self.tick_start = None
+        self.prev_seconds = None
+        self.frames = 0
+        self.missed_frames = 0
+        self.summary = []
+        self.metrics = {}
+
+    def start_tick(self, seconds_elapsed):
+        """Starts timing a tick and counts the frames we missed since the previous one"""
+        if self.prev_seconds is not None:
+            missed = round((seconds_elapsed - self.prev_seconds) * tick_rate) - 1
+            if missed > 0:
+                self.missed_frames += missed
+        self.prev_seconds = seconds_elapsed
+        self.frames += 1
+        self.current.clear()
+        self.tick_start = perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        """Times the code in the with block as part of the stage"""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.current[name] += perf_counter() - start
+
+    def end_tick(self, step):
+        """Stores the timings of the tick under the step the bot ended up in"""
+        self.current['total'] = perf_counter() - self.tick_start
+        for name, duration in self.current.items():
+            self.samples[(step, name)].append(duration)
+        if self.frames % self.summary_interval == 0:
+            self.summary = self.summary_lines(step)
+
+    def set_metric(self, name, value):
+        """Stores the latest value of a metric that gets shown and saved with the timings"""
+        self.metrics[name] = value
+
+    def percentiles(self, step, name):
+        """Returns the p50, p95 and p99 of a stage in a step in milliseconds"""
+        return np.percentile(np.array(self.samples[(step, name)]) * 1000, [50, 95, 99])
+
+    def summary_lines(self, step):
+        """Returns the lines with the percentiles of every stage of a step"""
+        lines = [f'{step}, missed {self.missed_frames}/{self.frames + self.missed_frames} frames']
+        for name in stages + ['total']:
+            if (step, name) in self.samples:
+                p50, p95, p99 = self.percentiles(step, name)
+                lines.append(f'{name}: {p50:.2f} / {p95:.2f} / {p99:.2f} ms')
+        for name, value in self.metrics.items():
+            lines.append(f'{name}: {value:.3f}')
+        return lines
+
+    def render(self, renderer, x, y):
+        """Draws the latest summary, which only gets recomputed every summary interval"""
+        renderer.begin_rendering('Profiler')
+        for i, line in enumerate(self.summary):
+            renderer.draw_string_2d(x, y + 20 * i, 1, 1, line, renderer.white())
+        renderer.end_rendering()
+
+    def dump_csv(self, path):
+        """Writes the percentiles of every stage in every step and the missed frames to a csv file"""
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['step', 'stage', 'samples', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'])
+            for (step, name), samples in sorted(self.samples.items()):
+                p50, p95, p99 = self.percentiles(step, name)
+                writer.writerow([step, name, len(samples), p50, p95, p99, max(samples) * 1000])
+            writer.writerow(['all', 'missed frames', self.missed_frames, '', '', '', ''])
+            for name, value in self.metrics.items():
+                writer.writerow(['all', name, '', value, '', '', ''])
@@ -0,0 +1,187 @@
+"""Module that records the inputs of Hypebot every tick and replays them headless as fast as possible"""
+import ctypes
+import struct
+import sys
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from rlbot.agents.base_agent import SimpleControllerState
+from rlbot.utils.structures.ball_prediction_struct import BallPrediction as BallPredictionPacket
+from rlbot.utils.structures.game_data_struct import GameTickPacket, FieldInfoPacket
+
+recording_dir = Path(__file__).absolute().parent / 'recordings'
+magic = b'HYPEREC'
+log_version = 2
+# index, team, size of the packet, field info, ball prediction and controls, length of the compressed field info and
+# whether the jump shot search ran in the background
+header_format = struct.Struct('<7sB2i4iI?')
+length_format = struct.Struct('<I')
+controls_format = struct.Struct('<5f4?')
+packet_size = ctypes.sizeof(GameTickPacket)
+prediction_size = ctypes.sizeof(BallPredictionPacket)
+field_info_size = ctypes.sizeof(FieldInfoPacket)
+# Level 1 is a lot faster than the default and the tick deltas are mostly zeros anyway
+compression_level = 1
+
+
+def pack_controls(controls):
+    """Returns the controls as bytes"""
+    return controls_format.pack(controls.throttle, controls.steer, controls.pitch, controls.yaw, controls.roll,
+                                bool(controls.jump), bool(controls.boost), bool(controls.handbrake),
+                                bool(controls.use_item))
+
+
+def unpack_controls(data):
+    """Returns the controls out of bytes"""
+    throttle, steer, pitch, yaw, roll, jump, boost, handbrake, use_item = controls_format.unpack(data)
+    return SimpleControllerState(steer=steer, throttle=throttle, pitch=pitch, yaw=yaw, roll=roll, jump=jump,
+                                 boost=boost, handbrake=handbrake, use_item=use_item)
+
+
+class Recorder:
+    """Class that writes the packet, ball prediction and controls of every tick to a log.
+    The field info doesn't change during a match so it is only written once in the header.
+    Every tick is stored as the zlib compressed xor with the previous tick, so unchanged bytes cost almost nothing"""
+
+    def __init__(self, path, field_info, index, team, async_simulation):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.path, 'wb')
+        field_info = zlib.compress(bytes(field_info), compression_level)
+        self.file.write(header_format.pack(magic, log_version, index, team, packet_size, field_info_size,
+                                           prediction_size, controls_format.size, len(field_info),
+                                           async_simulation))
+        self.file.write(field_info)
+        self.previous = np.zeros(packet_size + prediction_size, np.uint8)
+        self.ticks = 0
+
+    def record(self, packet, ball_prediction, controls):
+        """Appends a tick to the log, a missing ball prediction is stored as an empty one"""
+        tick = np.empty_like(self.previous)
+        tick[:packet_size] = np.frombuffer(packet, np.uint8, packet_size)
+        if ball_prediction is None:
+            tick[packet_size:] = 0
+        else:
+            tick[packet_size:] = np.frombuffer(ball_prediction, np.uint8, prediction_size)
+        data = zlib.compress(np.bitwise_xor(tick, self.previous).tobytes() + pack_controls(controls),
+                             compression_level)
+        self.previous = tick
+        self.file.write(length_format.pack(len(data)))
+        self.file.write(data)
+        self.ticks += 1
+
+    def close(self):
+        """Closes the log"""
+        self.file.close()
+
+
+def recording_path(agent):
+    """Returns a new path in the recording directory for a recording of the agent"""
+    return recording_dir / f'{time.strftime("%Y%m%d-%H%M%S")}-{agent.index}.hyperec'
+
+
+class Recording:
+    """Class that reads a log written by the recorder"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as file:
+            header = file.read(header_format.size)
+            (log_magic, version, self.index, self.team, *sizes, field_info_length,
+             self.async_simulation) = header_format.unpack(header)
+            if log_magic != magic or version != log_version:
+                raise ValueError(f'{self.path} is not a version {log_version} recording')
+            if tuple(sizes) != (packet_size, field_info_size, prediction_size, controls_format.size):
+                raise ValueError(f'{self.path} was recorded with other RLBot structs than the installed ones')
+            self.field_info = FieldInfoPacket.from_buffer_copy(zlib.decompress(file.read(field_info_length)))
+            self.data = file.read()
+
+    def ticks(self):
+        """Yields the packet, ball prediction and recorded controls of every tick"""
+        tick = np.zeros(packet_size + prediction_size, np.uint8)
+        offset = 0
+        while offset < len(self.data):
+            length, = length_format.unpack_from(self.data, offset)
+            offset += length_format.size
+            data = zlib.decompress(self.data[offset:offset + length])
+            offset += length
+            np.bitwise_xor(tick, np.frombuffer(data, np.uint8, len(tick)), out=tick)
+            packet = GameTickPacket.from_buffer_copy(tick[:packet_size])
+            ball_prediction = BallPredictionPacket.from_buffer_copy(tick[packet_size:])
+            yield packet, ball_prediction, unpack_controls(data[len(tick):])
+
+
+class NullRenderer:
+    """Renderer that draws nothing, every method accepts anything and returns None"""
+
+    def __getattr__(self, name):
+        return self.nothing
+
+    @staticmethod
+    def nothing(*args, **kwargs):
+        return None
+
+
+def replay_agent_class(agent_class):
+    """Returns a subclass of the agent class with the BaseAgent services stubbed, so it runs without the game"""
+
+    class ReplayAgent(agent_class):
+        """Agent that gets its field info and ball prediction handed to it and draws nothing"""
+
+        def __init__(self, team, index, field_info):
+            super().__init__('Replay', team, index)
+            self.renderer = NullRenderer()
+            self.field_info = field_info
+            self.ball_prediction_struct = None
+            self.game_states = []
+
+        def get_field_info(self):
+            return self.field_info
+
+        def get_ball_prediction_struct(self):
+            return self.ball_prediction_struct
+
+        def set_game_state(self, game_state):
+            self.game_states.append(game_state)
+
+    return ReplayAgent
+
+
+def controls_differ(controls, recorded):
+    """Returns whether the controls differ from the recorded controls"""
+    return pack_controls(controls) != pack_controls(recorded)
+
+
+def replay(path, agent_class=None, async_simulation=None):
+    """Feeds a recording to a fresh agent tick by tick without waiting for anything.
+    The jump shot search runs like it did in the recording unless async_simulation says otherwise, only recordings
+    with the search on the tick thread replay to the same controls.
+    Returns the agent, the number of ticks, the number of ticks with other controls than recorded and the seconds"""
+    if agent_class is None:
+        from derevo import Hypebot
+        agent_class = Hypebot
+    recording = Recording(path)
+    agent = replay_agent_class(agent_class)(recording.team, recording.index, recording.field_info)
+    agent.async_simulation = recording.async_simulation if async_simulation is None else async_simulation
+    agent.initialize_agent()
+    ticks = mismatches = 0
+    start = time.perf_counter()
+    for packet, ball_prediction, recorded in recording.ticks():
+        agent.ball_prediction_struct = ball_prediction
+        controls = agent.get_output(packet)
+        mismatches += controls_differ(controls, recorded)
+        ticks += 1
+    seconds = time.perf_counter() - start
+    agent.retire()
+    return agent, ticks, mismatches, seconds
+
+
+if __name__ == '__main__':
+    for recording_file in sys.argv[1:]:
+        _, replayed_ticks, different_ticks, replay_seconds = replay(recording_file)
+        print(f'{recording_file}: {replayed_ticks} ticks in {replay_seconds:.2f}s '
+              f'({replayed_ticks / max(replay_seconds, 1e-9):.0f} ticks/s), '
+              f'{different_ticks} ticks with other controls than recorded')
@@ -1,11 +1,12 @@
 """"Module that handles the shooting strategy"""
 import math
 
+import kernels
 from halfflip import HalfFlip
-from rlutilities.linear_algebra import normalize, rotation, vec3, vec2, dot, norm
+from rlutilities.linear_algebra import vec3, vec2, dot, norm
 from rlutilities.mechanics import Dodge
 from steps import Step
-from util import cap, distance_2d, sign, line_backline_intersect, get_speed, velocity_forward, get_bounce
+from util import distance_2d, sign, line_backline_intersect, get_speed, velocity_forward, get_bounce, to_array
 
 
 def start_shooting(agent):
@@ -57,45 +58,10 @@ def shooting_target(agent):
     """"Method that gives the target for the shooting strategy"""
     ball = agent.info.ball
     car = agent.info.my_car
-    ball_target = ball.position + 200 * normalize(vec3(vec2(agent.their_goal.center - vec3(0, 5120, 0))))
-    car_to_ball = ball_target - car.position
-    backline_intersect = line_backline_intersect(
-        agent.their_goal.center[1], vec2(car.position), vec2(car_to_ball))
-    if abs(backline_intersect) < 700:
-        goal_to_ball = normalize(car.position - ball_target)
-        error = 0
-    else:
-        # Right of the ball
-        if -500 > backline_intersect:
-            target = agent.their_goal.corners[3] + vec3(400, 0, 0)
-        # Left of the ball
-        elif backline_intersect > 500:
-            target = agent.their_goal.corners[2] - vec3(400, 0, 0)
-        goal_to_ball = normalize(ball_target - target)
-        # Subtract the goal to car vector
-        difference = goal_to_ball - normalize(car.position - target)
-        error = cap(abs(difference[0]) + abs(difference[1]), 0, 5)
-
-    goal_to_ball_2d = vec2(goal_to_ball[0], goal_to_ball[1])
-    test_vector_2d = dot(rotation(0.5 * math.pi), goal_to_ball_2d)
-    test_vector = vec3(test_vector_2d[0], test_vector_2d[1], 0)
-
-    distance = cap((40 + distance_2d(ball_target, car.position) * (error ** 2)) / 1.8, 0, 4000)
-    location = ball_target + vec3((goal_to_ball[0] * distance), goal_to_ball[1] * distance, 0)
-
-    # this adjusts the target based on the ball velocity perpendicular
-    # to the direction we're trying to hit it
-    multiplier = cap(distance_2d(car.position, location) / 1500, 0, 2)
-    distance_modifier = cap(dot(test_vector, ball.velocity) * multiplier, -1000, 1000)
-    location += vec3(
-        test_vector[0] * distance_modifier, test_vector[1] * distance_modifier, 0)
-
-    # another target adjustment that applies if the ball is close to the wall
-    extra = 3850 - abs(location[0])
-    if extra < 0:
-        location[0] = cap(location[0], -3850, 3850)
-        location[1] = location[1] + (-sign(agent.team) * cap(extra, -800, 800))
-    return location
+    target = kernels.shooting_target(to_array(ball.position), to_array(ball.velocity), to_array(car.position),
+                                     to_array(agent.their_goal.center), to_array(agent.their_goal.corners[3]),
+                                     to_array(agent.their_goal.corners[2]), float(sign(agent.team)))
+    return vec3(target[0], target[1], target[2])
 
 
 def should_dodge(agent):
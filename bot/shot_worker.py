@@ -0,0 +1,68 @@
+"""Module that runs the jump shot search in the background so the tick loop never waits for it"""
+import logging
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from jump_shot import jump_shot
+
+Plan = namedtuple('Plan', ['can_dodge', 'duration', 'target', 'time', 'staleness'])
+
+
+class ShotWorker:
+    """Class that hands car and ball states to a jump shot search on a background thread and keeps its latest finished
+    plan. The search runs in this process so it shares the plan cache with the tick thread.
+    Work and plans older than the deadline, in game seconds, are thrown away.
+    search is called with the state and any extra arguments of submit and returns a plan like jump_shot does"""
+
+    def __init__(self, deadline=0.05, search=jump_shot, logger=None):
+        self.deadline = deadline
+        self.search = search
+        self.logger = logger or logging.getLogger(__name__)
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.future = None
+        self.submitted_at = None
+        self.latest = None
+        self.latest_time = None
+        self.errors = 0
+
+    def submit(self, time, position, velocity, orientation, boost, ball_locations, *extra):
+        """Starts a search for the state at the given game time, unless the current search is still up to date.
+        The arrays are searched in the background so they must not change afterwards"""
+        self.collect(time)
+        if self.future is not None:
+            if time - self.submitted_at <= self.deadline:
+                return
+            # A search that already started can't be stopped, its result gets dropped when it is collected
+            self.future.cancel()
+        self.submitted_at = time
+        self.future = self.executor.submit(self.search, position, velocity, orientation, boost, ball_locations, *extra)
+
+    def collect(self, time):
+        """Stores the result of the current search when it is done and still up to date. A failed search leaves no plan
+        and is counted, only the first failure gets logged with its traceback so the tick loop keeps driving"""
+        if self.future is None:
+            return
+        if self.future.cancelled():
+            self.future = None
+        elif self.future.done():
+            future, self.future = self.future, None
+            error = future.exception()
+            if error is not None:
+                self.errors += 1
+                if self.errors == 1:
+                    self.logger.error('Jump shot search failed', exc_info=error)
+            elif time - self.submitted_at <= self.deadline:
+                self.latest = future.result()
+                self.latest_time = self.submitted_at
+
+    def plan(self, time):
+        """Returns the most recent finished plan tagged with how stale it is, or None when it is out of date"""
+        self.collect(time)
+        if self.latest is None or time - self.latest_time > self.deadline:
+            return None
+        can_dodge, duration, target = self.latest
+        return Plan(can_dodge, duration, target, self.latest_time, time - self.latest_time)
+
+    def shutdown(self):
+        """Stops the background worker without waiting for the current search"""
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,73 @@
+"""Module that benchmarks the startup of the bot: importing it, initializing it and playing the first kickoff ticks.
+Every run is a fresh process so the imports aren't cached, the compiled kernels do stay cached on disk"""
+import argparse
+import json
+import subprocess
+import sys
+from random import Random
+from time import perf_counter
+
+# The first tick is compared with the ticks after it, which no longer pay for anything that was left lazy
+steady_ticks = 20
+
+
+def measure(exercise_name):
+    """Imports, initializes and runs the bot on the first packet of the exercise in this process and returns the
+    import time, the init time, the latency of the first tick and the median latency of the ticks after it"""
+    start = perf_counter()
+    from derevo import Hypebot
+    import_time = perf_counter() - start
+
+    import numpy as np
+    from rlbottraining.rng import SeededRandomNumberGenerator
+    from headless import make_field_info, make_packet, ball_from_packet, predict_ball, default_exercises, \
+        exercise_teams
+    from replay import replay_agent_class
+    exercise = next(exercise for exercise in default_exercises() if exercise_name.lower() in exercise.name.lower())
+    game_state = exercise.make_game_state(SeededRandomNumberGenerator(Random(0)))
+    teams = exercise_teams(exercise, game_state)
+    packet = make_packet(game_state, teams)
+    ball_prediction = predict_ball(ball_from_packet(packet))
+
+    start = perf_counter()
+    agent = replay_agent_class(Hypebot)(teams[0], 0, make_field_info())
+    agent.async_simulation = False
+    agent.render_profile = False
+    agent.initialize_agent()
+    init_time = perf_counter() - start
+
+    agent.ball_prediction_struct = ball_prediction
+    tick_times = []
+    for tick in range(steady_ticks + 1):
+        packet.game_info.seconds_elapsed = tick / 120
+        start = perf_counter()
+        agent.get_output(packet)
+        tick_times.append(perf_counter() - start)
+    agent.shot_worker.shutdown()
+    return {'import': import_time, 'init': init_time, 'first tick': tick_times[0],
+            'steady tick': float(np.median(tick_times[1:]))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5, help='fresh processes to measure')
+    parser.add_argument('--exercise', default='Right Corner', help='exercise whose first packet is played')
+    parser.add_argument('--once', action='store_true', help='measure in this process and print the result as json')
+    args = parser.parse_args()
+
+    if args.once:
+        print(json.dumps(measure(args.exercise)))
+        return
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run([sys.executable, __file__, '--once', '--exercise', args.exercise], check=True,
+                                capture_output=True, text=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    print(f'{"phase":<12} {"median":>10} {"max":>10}')
+    for phase in runs[0]:
+        times = sorted(run[phase] * 1000 for run in runs)
+        print(f'{phase:<12} {times[len(times) // 2]:8.1f}ms {times[-1]:8.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
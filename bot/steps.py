@@ -14,3 +14,4 @@ class Step(Enum):
     Dodge_2 = 9
     HalfFlip = 10
     Rotating = 11
+    Aerial = 12
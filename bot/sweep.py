@@ -0,0 +1,113 @@
+"""Module that plays seed sweeps of the exercises on the local simulation spread over a process pool"""
+import argparse
+import csv
+from collections import namedtuple, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from time import perf_counter
+
+import numpy as np
+
+from rlbot.training.training import Pass
+from rlbottraining.rng import SeededRandomNumberGenerator
+
+from headless import default_exercises, exercise_teams, make_packet
+from local_match import LocalMatch
+
+Run = namedtuple('Run', ['exercise', 'seed', 'passed', 'grade', 'game_seconds', 'wall_seconds', 'ticks',
+                         'tick_p50_ms', 'tick_p95_ms', 'tick_max_ms'])
+
+_exercises = None
+
+
+def get_exercises():
+    """Returns the exercises, loading them once per process"""
+    global _exercises
+    if _exercises is None:
+        _exercises = default_exercises()
+    return _exercises
+
+
+def seed_dependent(exercise, seeds=(0, 1)):
+    """Returns whether the game state of the exercise changes with the seed, only those are worth a sweep"""
+    packets = []
+    for seed in seeds:
+        game_state = exercise.make_game_state(SeededRandomNumberGenerator(Random(seed)))
+        packets.append(bytes(make_packet(game_state, exercise_teams(exercise, game_state))))
+    return any(packet != packets[0] for packet in packets[1:])
+
+
+def play(task):
+    """Plays an exercise with a seed and returns the run, the exercise is passed as its index to keep tasks small"""
+    index, seed = task
+    result = LocalMatch(get_exercises()[index], seed).play()
+    tick_ms = result.tick_times * 1000 if len(result.tick_times) > 0 else np.zeros(1)
+    p50, p95 = np.percentile(tick_ms, [50, 95])
+    return Run(result.exercise.name, seed, isinstance(result.grade, Pass), repr(result.grade), result.game_seconds,
+               result.wall_seconds, len(result.tick_times), float(p50), float(p95), float(tick_ms.max()))
+
+
+def tasks(seeds, name_filter=None):
+    """Returns an (exercise index, seed) task for every seed of the seed dependent exercises and a single task for
+    the others"""
+    result = []
+    for index, exercise in enumerate(get_exercises()):
+        if name_filter is not None and name_filter.lower() not in exercise.name.lower():
+            continue
+        exercise_seeds = seeds if seed_dependent(exercise) else seeds[:1]
+        result += [(index, seed) for seed in exercise_seeds]
+    return result
+
+
+def sweep(seeds, workers=None, shard_size=4, name_filter=None):
+    """Plays every task on a process pool, every worker gets shards of tasks at once"""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(play, tasks(seeds, name_filter), chunksize=shard_size))
+
+
+def report(runs):
+    """Returns the lines of a report with the pass rate, time to grade and tick compute time of every exercise"""
+    by_exercise = defaultdict(list)
+    for run in runs:
+        by_exercise[run.exercise].append(run)
+    lines = [f'{"exercise":<28} {"runs":>5} {"passed":>7} {"graded p50":>11} {"graded p95":>11} '
+             f'{"tick p50":>9} {"tick p95":>9} {"tick max":>9}']
+    for name, exercise_runs in by_exercise.items():
+        passed = sum(run.passed for run in exercise_runs)
+        graded = np.percentile([run.game_seconds for run in exercise_runs], [50, 95])
+        lines.append(f'{name:<28} {len(exercise_runs):5d} {passed / len(exercise_runs):7.1%} '
+                     f'{graded[0]:10.2f}s {graded[1]:10.2f}s '
+                     f'{np.median([run.tick_p50_ms for run in exercise_runs]):7.2f}ms '
+                     f'{max(run.tick_p95_ms for run in exercise_runs):7.2f}ms '
+                     f'{max(run.tick_max_ms for run in exercise_runs):7.2f}ms')
+        failed_seeds = [run.seed for run in exercise_runs if not run.passed]
+        if failed_seeds:
+            lines.append(f'    failed seeds: {failed_seeds[:20]}{" ..." if len(failed_seeds) > 20 else ""}')
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seeds', type=int, default=32, help='number of seeds per seed dependent exercise')
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help='processes, one per cpu by default')
+    parser.add_argument('--shard-size', type=int, default=4, help='tasks a worker takes at once')
+    parser.add_argument('--exercise', default=None, help='only play exercises with this in their name')
+    parser.add_argument('--csv', default=None, help='also write every run to this csv file')
+    args = parser.parse_args()
+
+    start = perf_counter()
+    runs = sweep(list(range(args.first_seed, args.first_seed + args.seeds)), args.workers, args.shard_size,
+                 args.exercise)
+    for line in report(runs):
+        print(line)
+    print(f'{len(runs)} runs in {perf_counter() - start:.1f}s')
+    if args.csv is not None:
+        with open(args.csv, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(Run._fields)
+            writer.writerows(runs)
+
+
+if __name__ == '__main__':
+    main()
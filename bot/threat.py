@@ -0,0 +1,42 @@
+"""Module that estimates for every opponent at once how soon it gets to the ball and how likely it shoots at our goal"""
+import numpy as np
+
+# Opponents that get to the ball further than this from our goal aren't a threat
+max_shot_distance = 6000
+# Opponents more likely to shoot than this make us defend or rotate back
+shot_threshold = 0.5
+# An opponent that gets to the ball on a kickoff more than this many seconds before our taker wins it. Mirrored spawns
+# arrive at about the same time, so a normal kickoff doesn't count
+kickoff_margin = 0.1
+
+
+class Threats:
+    """Class that holds the time every opponent gets to the ball and how likely it shoots at our goal from there for
+    the current tick. An opponent is likely to shoot when its intercept is close to our goal and it drives through the
+    ball towards our goal, opponents that can't reach the ball in the prediction arrive at infinity"""
+
+    def __init__(self, game_arrays, intercepts, index, goal):
+        opponents = game_arrays.opponents(index)
+        self.opponents = opponents[~game_arrays.is_demolished[opponents]]
+        found = intercepts.found[self.opponents]
+        self.time = np.where(found, intercepts.time[self.opponents], np.inf)
+        self.likelihood = np.zeros(len(self.opponents))
+        if intercepts.ball_prediction.num_slices == 0 or not found.any():
+            return
+        ball = intercepts.ball_prediction.position[intercepts.index[self.opponents], :2].astype(float)
+        car_to_ball = ball - game_arrays.position[self.opponents, :2]
+        ball_to_goal = goal[:2] - ball
+        goal_distance = np.linalg.norm(ball_to_goal, axis=1)
+        alignment = np.sum(car_to_ball * ball_to_goal, axis=1) / \
+            np.maximum(np.linalg.norm(car_to_ball, axis=1) * goal_distance, 1e-10)
+        self.likelihood = found * np.clip(alignment, 0, 1) * np.clip(1 - goal_distance / max_shot_distance, 0, 1)
+
+    @property
+    def earliest_time(self):
+        """Time until the first opponent gets to the ball"""
+        return self.time.min() if len(self.time) > 0 else np.inf
+
+    def danger(self, before=np.inf):
+        """Returns the highest shot likelihood of the opponents that get to the ball before the time"""
+        arriving = self.time < before
+        return self.likelihood[arriving].max() if arriving.any() else 0.0
@@ -1,8 +1,12 @@
 """Module with all the utility methods"""
 import math
 
-from rlutilities.linear_algebra import vec2, norm, dot, vec3, normalize
-from jump_sim import get_time_at_height, get_time_at_height_boost
+import numpy as np
+
+import kernels
+from drive_table import get_drive_table, max_time as max_drive_time
+from rlutilities.linear_algebra import vec2, norm, dot, vec3
+
 
 def distance_2d(vec_a, vec_b):
     """returns 2d distance between two vectors"""
@@ -17,44 +21,26 @@ def not_back(car, ball, goal):
     return 2 * distance_2d(ball, goal) < 3 * distance_2d(car, goal)
 
 
-def get_intersect(agent, car):
-    ball_prediction = agent.get_ball_prediction_struct()
-    intercept_time = (norm(agent.info.ball.position - car.position) - 200) / max(1, int(norm(car.velocity)))
-    intercept_index = cap(int(intercept_time * 60), 0, ball_prediction.num_slices - 1)
-    intercept_location = ball_prediction.slices[intercept_index].physics.location
-    return vec3(intercept_location.x, intercept_location.y, intercept_location.z)
+def get_intersect(agent, index):
+    """Returns the location where the car with the given index can first reach the ball"""
+    if agent.ball_prediction.num_slices == 0:
+        return vec3(agent.info.ball.position)
+    return agent.intercepts.location(index)
 
 
 def get_closest_small_pad(agent, location):
-    """Gets the small boostpad closest to the bot"""
-    pads = agent.small_boost_pads
-    closest_pad = None
-    distance = math.inf
-    for pad in pads:
-        if distance_2d(location, pad.location) < distance:
-            distance = distance_2d(agent.info.my_car.position, pad.location)
-            closest_pad = pad
-    return closest_pad
+    """Gets the small boostpad closest to the location"""
+    return agent.boost_pad_index.closest(location, full_boost=False)
 
 
 def get_closest_big_pad(agent):
     """Gets the big boostpad closest to the bot"""
-    pads = agent.boost_pads
-    closest_pad = None
-    distance = math.inf
-    for pad in pads:
-        if distance_2d(agent.info.my_car.position, pad.location) < distance:
-            distance = distance_2d(agent.info.my_car.position, pad.location)
-            closest_pad = pad
-    return closest_pad
+    return agent.boost_pad_index.closest(agent.info.my_car.position, full_boost=True)
 
 
 def line_backline_intersect(y_axis, origin, direction):
     """Returns the location where the ray intersects with the Y"""
-    if abs(direction[1]) < 1e-10:
-        direction[1] = 1e-10
-    mult = (y_axis - origin[1]) / direction[1]
-    return (origin + mult * direction)[0]
+    return kernels.backline_intersect(y_axis, origin[0], origin[1], direction[0], direction[1])
 
 
 def sign(num):
@@ -73,28 +59,22 @@ def velocity_forward(car):
     return dot(car.forward(), car.velocity)
 
 
-def boost_needed(initial_speed, goal_speed):
-    """Returns the boost amount you need to reach the target speed given the initial speed"""
-    p_1 = 6.31e-06
-    p_2 = 0.010383
-    p_3 = 1.3183
-    boost_initial = p_1 * initial_speed ** 2 + p_2 * initial_speed + p_3
-    boost_goal = p_1 * goal_speed ** 2 + p_2 * goal_speed + p_3
-    return boost_goal - boost_initial
+def drive_time(agent, locations):
+    """Returns the time the bot needs to drive to every row of the (n, 3) locations and the boost that uses"""
+    car = agent.info.my_car
+    return get_drive_table().arrival(to_array(car.position), to_array(car.forward()), to_array(car.velocity),
+                                     car.boost, np.asarray(locations, float).reshape(-1, 3))
 
 
 def is_reachable(agent, location, eta):
     """Returns whether the bot can reach a certain location in time"""
-    distance = distance_2d(agent.info.my_car.position, location)
-    if eta == 0:
-        return False
-    speed = distance / eta
-    if speed < 2300:
-        if speed < 1399:
-            return True
-        return (agent.info.my_car.boost >
-               boost_needed(velocity_2d(agent.info.my_car.velocity), speed))
-    return None
+    return eta > 0 and bool(reachable_mask(agent, to_array(location), np.array([eta]))[0])
+
+
+def reachable_mask(agent, locations, etas):
+    """Returns for arrays of locations and times whether the bot can reach each location in time"""
+    times, _ = drive_time(agent, locations)
+    return (etas > 0) & (times <= etas) & (times < max_drive_time)
 
 
 def get_speed(agent, location):
@@ -137,12 +117,18 @@ def cap(num, low, high):
 
 def get_bounce(agent):
     """Returns the first reachable bounce"""
-    for i in range(len(agent.bounces)):
-        goal_to_ball = normalize(z_0(agent.bounces[i][0] - agent.their_goal.center))
-        target = agent.bounces[i][0] + 40 * goal_to_ball
-        if is_reachable(agent, target, agent.bounces[i][1]):
-            return [target, agent.bounces[i][1]]
-    return None
+    events = agent.ball_events
+    if len(events.bounce_indices) == 0:
+        return None
+    goal_to_ball = events.bounce_positions - to_array(agent.their_goal.center)
+    goal_to_ball[:, 2] = 0
+    goal_to_ball /= np.maximum(np.linalg.norm(goal_to_ball, axis=1), 1e-10)[:, None]
+    targets = events.bounce_positions + 40 * goal_to_ball
+    reachable = reachable_mask(agent, targets, events.bounce_times)
+    if not reachable.any():
+        return None
+    i = reachable.argmax()
+    return [vec3(float(targets[i, 0]), float(targets[i, 1]), float(targets[i, 2])), events.bounce_times[i]]
 
 
 def z_0(vector):
@@ -152,3 +138,15 @@ def z_0(vector):
 
 def lerp(a, b, t):
     return a + (b - a) * t
+
+
+def to_array(vector):
+    """Returns a numpy array of a vec3 or a ball prediction Vector3"""
+    if hasattr(vector, 'x'):
+        return np.array([vector.x, vector.y, vector.z])
+    return np.array([vector[0], vector[1], vector[2]])
+
+
+def orientation_to_array(orientation):
+    """Returns a numpy array of a mat3 with the same row and column order"""
+    return np.array([[orientation[i, j] for j in range(3)] for i in range(3)])
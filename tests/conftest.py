@@ -0,0 +1,5 @@
+"""Makes the modules of the bot importable by their bare names, like RLBot does when it runs the bot"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).absolute().parent.parent / 'bot'))
@@ -0,0 +1,36 @@
+import numpy as np
+
+from aerial import aerial_intercept, aerial_constraints, chunk_size
+
+position, velocity = np.array([0, 0, 17.0]), np.zeros(3)
+forward, up = np.array([1.0, 0, 0]), np.array([0, 0, 1.0])
+goal = np.array([0, 5120.0, 320])
+times = np.arange(1, 241) / 60
+
+
+def test_earliest_viable_slice():
+    ball_locations = np.tile([0, 300, 1000.0], (len(times), 1))
+    plan = aerial_intercept(position, velocity, forward, up, 100, ball_locations, times, goal)
+    _, viable = aerial_constraints(position, velocity, forward, up, 100, ball_locations[:plan.index + 1],
+                                   times[:plan.index + 1])
+    assert viable[plan.index] and not viable[:plan.index].any()
+    assert plan.time == times[plan.index]
+    # The target is behind the ball as seen from the goal
+    assert plan.target[1] < 300 and plan.target[2] > 1000
+
+
+def test_work_is_bounded_by_chunks():
+    ball_locations = np.tile([0, 300, 1000.0], (len(times), 1))
+    plan = aerial_intercept(position, velocity, forward, up, 100, ball_locations, times, goal)
+    assert plan.index >= chunk_size
+    assert aerial_intercept(position, velocity, forward, up, 100, ball_locations, times, goal, 1) is None
+    bounded = aerial_intercept(position, velocity, forward, up, 100, ball_locations, times, goal,
+                               plan.index // chunk_size + 1)
+    assert bounded.index == plan.index
+
+
+def test_low_balls_and_no_boost():
+    low = np.tile([0, 300, 200.0], (len(times), 1))
+    high = np.tile([0, 300, 1000.0], (len(times), 1))
+    assert aerial_intercept(position, velocity, forward, up, 100, low, times, goal) is None
+    assert aerial_intercept(position, velocity, forward, up, 0, high, times, goal) is None
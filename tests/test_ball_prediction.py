@@ -0,0 +1,139 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('rlutilities.linear_algebra')
+
+from ball_prediction import BallPrediction, BallTrajectory, PredictionTracker, detect_events, advance_events, fps
+from contact import ball_radius
+
+own_goal_sign = -1
+gravity = np.array([0, 0, -650])
+
+
+def bouncing_ball(start, velocity, num_slices=360, time=100.0, start_slice=0):
+    """Returns the ball prediction of a ball that flies from start and bounces off the floor, starting start_slice
+    slices into its flight. The ball spins the other way after every bounce"""
+    substeps = 8
+    position, velocity = np.array(start, float), np.array(velocity, float)
+    spin = np.array([0, 1.0, 0])
+    positions, velocities, spins = [], [], []
+    for _ in range(start_slice + num_slices):
+        positions.append(position.copy())
+        velocities.append(velocity.copy())
+        spins.append(spin.copy())
+        for _ in range(substeps):
+            velocity[2] -= 650 / fps / substeps
+            position += velocity / fps / substeps
+            if position[2] < ball_radius and velocity[2] < 0:
+                position[2] = 2 * ball_radius - position[2]
+                velocity[2] *= -0.6
+                spin = -spin
+    rows = slice(start_slice, None)
+    game_seconds = time + np.arange(num_slices) / fps
+    return BallPrediction.from_arrays(np.array(positions)[rows], np.array(velocities)[rows], np.array(spins)[rows],
+                                      game_seconds, time)
+
+
+def test_detect_events_finds_the_bounces():
+    ball_prediction = bouncing_ball([0, 0, 800], [0, -1000, 0])
+    events = detect_events(ball_prediction, ball_prediction.angular_velocity[0], own_goal_sign)
+    assert len(events.bounce_indices) >= 2
+    assert (ball_prediction.height[events.bounce_indices] < 2 * ball_radius).all()
+    np.testing.assert_array_equal(events.bounce_times, ball_prediction.time_until[events.bounce_indices])
+    # Rolling at 1000 uu/s from the center the ball reaches our goal line after a bit more than 5 seconds
+    assert ball_prediction.position[events.conceding_index, 1] < -5120
+    assert 5 < ball_prediction.time_until[events.conceding_index] < 5.5
+    assert events.airborne_intervals[0, 0] == 0
+    assert events.bouncing
+
+
+def test_advanced_events_match_a_new_search():
+    shift = 30
+    previous = bouncing_ball([0, 0, 800], [0, 500, 0])
+    current = bouncing_ball([0, 0, 800], [0, 500, 0], time=previous.time + shift / fps, start_slice=shift)
+    events = detect_events(previous, previous.angular_velocity[0], own_goal_sign)
+    advanced = advance_events(events, current, shift, shift / fps)
+    expected = detect_events(current, current.angular_velocity[0], own_goal_sign)
+    # The advanced events don't know the bounces past the end of the previous prediction
+    known = expected.bounce_indices < previous.num_slices - shift
+    np.testing.assert_array_equal(advanced.bounce_indices, expected.bounce_indices[known])
+    np.testing.assert_allclose(advanced.bounce_times, expected.bounce_times[known], atol=1e-6)
+
+
+def test_advanced_events_know_when_the_ball_stops_bouncing():
+    shift = 45
+    previous = bouncing_ball([0, 0, 250], [0, 500, 0])
+    current = bouncing_ball([0, 0, 250], [0, 500, 0], time=previous.time + shift / fps, start_slice=shift)
+    events = detect_events(previous, previous.angular_velocity[0], own_goal_sign)
+    advanced = advance_events(events, current, shift, shift / fps)
+    assert events.bouncing
+    assert not advanced.bouncing
+    assert advanced.bouncing == detect_events(current, current.angular_velocity[0], own_goal_sign).bouncing
+
+
+def test_tracker_reasons():
+    tracker = PredictionTracker()
+    previous = bouncing_ball([0, 0, 800], [0, 500, 0])
+    assert tracker.update(previous, None) == 'no prediction'
+    shift = 1
+    current = bouncing_ball([0, 0, 800], [0, 500, 0], time=previous.time + shift / fps, start_slice=shift)
+    assert tracker.update(current, None) is None
+    assert tracker.shift == pytest.approx(shift, abs=1e-3)
+    assert tracker.update(current, 'touched') == 'touch'
+    changed = bouncing_ball([0, 0, 800], [500, 500, 0], time=current.time)
+    assert tracker.update(changed, 'touched') == 'path'
+    assert tracker.change_rate == pytest.approx(0.75)
+
+
+def test_tracker_searches_again_past_the_horizon():
+    tracker = PredictionTracker()
+    tracker.update(bouncing_ball([0, 0, 800], [0, 500, 0]), None)
+    shift = 40
+    current = bouncing_ball([0, 0, 800], [0, 500, 0], time=100 + shift / fps, start_slice=shift)
+    assert tracker.update(current, None) == 'horizon'
+
+
+def test_prediction_copy_keeps_its_values():
+    ball_prediction = bouncing_ball([0, 0, 800], [0, 500, 0])
+    copy = ball_prediction.copy()
+    ball_prediction.position[:] = 0
+    assert (copy.position[:, 2] > 0).all()
+
+
+def flying_ball(times):
+    """Returns the positions and velocities of a ball flying without bouncing, the trajectory is exact for it"""
+    start, velocity = np.array([100.0, -2000, 300]), np.array([400.0, 1500, 800])
+    times = times[:, None]
+    return start + times * velocity + 0.5 * times ** 2 * gravity, velocity + times * gravity
+
+
+def test_trajectory_matches_the_slices():
+    ball_prediction = bouncing_ball([0, 0, 800], [300, 500, 0])
+    trajectory = ball_prediction.trajectory
+    np.testing.assert_allclose(trajectory.position_at(trajectory.times), ball_prediction.position, rtol=1e-12,
+                               atol=1e-9)
+    np.testing.assert_allclose(trajectory.velocity_at(trajectory.times), ball_prediction.velocity, rtol=1e-12,
+                               atol=1e-9)
+    np.testing.assert_allclose(trajectory.position_at(trajectory.times[7]), ball_prediction.position[7], atol=1e-9)
+
+
+def test_trajectory_between_the_slices():
+    times = np.arange(0, 2, 1 / fps)
+    trajectory = BallTrajectory(times, *flying_ball(times))
+    between = np.linspace(0, times[-1], 1000)
+    position, velocity = flying_ball(between)
+    np.testing.assert_allclose(trajectory.position_at(between), position, atol=1e-6)
+    np.testing.assert_allclose(trajectory.velocity_at(between), velocity, atol=1e-6)
+
+
+def test_crossing_times():
+    times = np.arange(0, 3, 1 / fps)
+    trajectory = BallTrajectory(times, *flying_ball(times))
+    # z = 300 + 800 t - 325 t^2 falls below 200 at its positive root and y = -2000 + 1500 t crosses 0 at 4 / 3
+    expected = (800 + np.sqrt(800 ** 2 + 4 * 325 * 100)) / 650
+    assert trajectory.first_time_below(200) == pytest.approx(expected, abs=1e-9)
+    assert trajectory.first_crossing_y(0) == pytest.approx(4 / 3, abs=1e-9)
+    # The ball starts below this height
+    assert trajectory.first_time_below(500) == trajectory.times[0]
+    assert trajectory.first_time_below(-1000) is None
+    assert trajectory.first_crossing_y(5120) is None
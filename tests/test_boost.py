@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip('rlutilities.linear_algebra')
+
+from boost import BoostPad, BoostPadIndex, BoostRoutes, big_pad_respawn_time, small_pad_boost, route_speed
+
+# Field index, location and whether it is a big pad
+pad_layout = [
+    (0, [0, -1000, 73], False),
+    (1, [0, 1000, 73], False),
+    (2, [3000, 0, 73], True),
+    (3, [-3000, 0, 73], True),
+    (4, [1000, 1000, 73], False),
+]
+
+
+def boost_pads(active=None, timer=None):
+    """Returns the pad index of the layout with the pad arrays of the packet"""
+    game_arrays = SimpleNamespace(pad_active=np.ones(len(pad_layout), bool) if active is None else np.array(active),
+                                  pad_timer=np.zeros(len(pad_layout)) if timer is None else np.array(timer, float))
+    pads = [BoostPad(index, np.array(location, float), full, game_arrays) for index, location, full in pad_layout]
+    return BoostPadIndex(pads, game_arrays)
+
+
+def test_k_nearest():
+    index = boost_pads()
+    nearest = index.k_nearest(np.array([[0, -900, 17], [2500, 0, 17]]), 2)
+    np.testing.assert_array_equal(nearest, [[0, 1], [2, 4]])
+    np.testing.assert_array_equal(index.k_nearest(np.array([100, -900, 17]), 1, full_boost=True), [[2]])
+
+
+def test_inactive_pads_are_left_out():
+    index = boost_pads(active=[False, True, True, True, True], timer=[3.5, 0, 0, 0, 0])
+    np.testing.assert_allclose(index.time_until_active(), [0.5, 0, 0, 0, 0])
+    # With an infinite speed the pad is still inactive when we get there, driving slowly it is back
+    assert index.closest(np.array([0, -900, 17]), speed=np.inf).index == 1
+    assert index.closest(np.array([0, -900, 17]), speed=100).index == 0
+    assert index.closest(np.array([0, -900, 17]), full_boost=True, speed=np.inf).index in (2, 3)
+
+
+def test_within_radius():
+    index = boost_pads()
+    within = index.within_radius(np.array([[0, 0, 17]]), 1100)
+    np.testing.assert_array_equal(within, [[True, True, False, False, False]])
+
+
+def test_direct_route_without_boost_need():
+    routes = BoostRoutes(boost_pads())
+    route = routes.best_route(np.array([0, -2000, 17]), np.array([0, 0, 17]), 50, 20, 5)
+    assert route.pads == [] and route.boost == 50
+    assert route.time == pytest.approx(2000 / route_speed)
+
+
+def test_route_picks_up_enough_boost():
+    routes = BoostRoutes(boost_pads())
+    start, target = np.array([0, -2000, 17]), np.array([0, 2000, 17])
+    # One small pad on the way is enough, the fastest way over it is the pad on the line
+    route = routes.best_route(start, target, 10, 20, 10)
+    assert [pad.index for pad in route.pads] == [0]
+    assert route.boost == 10 + small_pad_boost
+    # Two small pads are needed for more
+    route = routes.best_route(start, target, 10, 30, 10)
+    assert [pad.index for pad in route.pads] == [0, 1]
+    # A big pad that is respawning doesn't give boost in time
+    respawning = BoostRoutes(boost_pads(active=[True, True, False, False, True],
+                                        timer=[0, 0, 0, 0, 0]))
+    assert respawning.best_route(start, target, 0, 90, big_pad_respawn_time - 1) is None
+    assert routes.best_route(start, target, 0, 90, 10).pads[0].is_full_boost
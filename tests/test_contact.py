@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from contact import Hit, ball_radius, car_hitbox, hitbox_contact, trajectory_contact
+from kernels import good_hit_height
+
+# Hitbox sizes and offsets of the octane and the plank in the packet
+game_arrays = SimpleNamespace(hitbox=np.array([[118.0, 84.2, 36.2], [128.8, 84.7, 29.4]]),
+                              hitbox_offset=np.array([[13.9, 0.0, 20.8], [9.0, 0.0, 15.8]]))
+num_samples = 2000
+
+
+def random_orientations(rng, count):
+    """Returns random rotation matrices"""
+    q = rng.normal(size=(count, 4))
+    w, x, y, z = (q / np.linalg.norm(q, axis=1)[:, None]).T
+    return np.stack([np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)], axis=1),
+                     np.stack([2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)], axis=1),
+                     np.stack([2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)], axis=1)], axis=1)
+
+
+def reference_contact(half_width, offset, car_positions, orientations, ball_positions):
+    """Returns the touching mask, the local contact points and the hit classes of every sample with numpy"""
+    centers = car_positions + np.einsum('nij,j->ni', orientations, offset)
+    local = np.einsum('nij,ni->nj', orientations, ball_positions - centers)
+    closest = np.clip(local, -half_width, half_width)
+    touching = np.sum((closest - local) ** 2, axis=1) <= ball_radius ** 2
+    height = ball_positions[:, 2] - centers[:, 2] - np.einsum('nj,nj->n', orientations[:, 2, :], closest)
+    hit = np.where(np.abs(height) < good_hit_height, Hit.Good, np.where(height > 0, Hit.Under, Hit.Over))
+    return touching, closest + offset, hit
+
+
+def random_samples(seed):
+    """Returns car and ball positions and car orientations where about half of the balls touch the car"""
+    rng = np.random.default_rng(seed)
+    car_positions = rng.uniform(-1000, 1000, (num_samples, 3))
+    orientations = random_orientations(rng, num_samples)
+    ball_positions = car_positions + rng.uniform(-180, 180, (num_samples, 3))
+    return car_positions, orientations, ball_positions
+
+
+def test_trajectory_contact_matches_numpy():
+    for index in range(len(game_arrays.hitbox)):
+        car_positions, orientations, ball_positions = random_samples(index)
+        touching, local_points, hits = reference_contact(*car_hitbox(game_arrays, index), car_positions,
+                                                         orientations, ball_positions)
+        assert 0.2 < touching.mean() < 0.8
+        # Every sample on its own checks every touch, trajectories of a few samples check the first one
+        for i in range(num_samples):
+            contact = trajectory_contact(game_arrays, index, car_positions[i:i + 1], orientations[i:i + 1],
+                                         ball_positions[i:i + 1])
+            if touching[i]:
+                assert contact.index == 0 and contact.hit == hits[i]
+                np.testing.assert_allclose(contact.local_point, local_points[i], atol=1e-9)
+            else:
+                assert contact.index is None and contact.hit == Hit.Nothing
+        for start in range(0, num_samples, 50):
+            rows = slice(start, start + 50)
+            contact = trajectory_contact(game_arrays, index, car_positions[rows], orientations[rows],
+                                         ball_positions[rows])
+            first = np.flatnonzero(touching[rows])
+            assert contact.index == (first[0] if len(first) > 0 else None)
+
+
+def test_hitbox_contact_matches_trajectory_contact():
+    car_positions, orientations, ball_positions = random_samples(2)
+    hitbox = car_hitbox(game_arrays, 0)
+    for i in range(0, num_samples, 10):
+        touching, good_hit = hitbox_contact(car_positions[None, i:i + 1], orientations[i], hitbox,
+                                            ball_positions[i:i + 1])
+        contact = trajectory_contact(game_arrays, 0, car_positions[i:i + 1], orientations[i:i + 1],
+                                     ball_positions[i:i + 1])
+        assert touching[0, 0] == (contact.index is not None)
+        if touching[0, 0]:
+            assert good_hit[0, 0] == (contact.hit == Hit.Good)
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from drive_table import DriveTable, distances, arrival_radius, max_time
+
+
+def test_analytic_fallback_is_saved(tmp_path, monkeypatch):
+    path = tmp_path / 'drive_table.npz'
+    table = DriveTable.load(path)
+    assert path.exists() and not table.generated
+
+    def build_again():
+        raise AssertionError('the saved analytic tables are built again')
+
+    monkeypatch.setattr(DriveTable, 'analytic', build_again)
+    loaded = DriveTable.load(path)
+    assert not loaded.generated
+    np.testing.assert_allclose(loaded.times, table.times, rtol=1e-6)
+    np.testing.assert_allclose(loaded.boost_used, table.boost_used, rtol=1e-6, atol=1e-5)
+
+
+def test_generated_tables_keep_their_flag(tmp_path):
+    path = tmp_path / 'drive_table.npz'
+    analytic = DriveTable.analytic()
+    DriveTable(analytic.times, analytic.boost_used, True).save(path)
+    assert DriveTable.load(path).generated
+
+
+def test_old_version_is_replaced(tmp_path):
+    path = tmp_path / 'drive_table.npz'
+    np.savez(path, version=0, times=np.zeros(1), boost_used=np.zeros(1), generated=True)
+    table = DriveTable.load(path)
+    assert not table.generated
+    assert DriveTable.load(path).times.shape == table.times.shape
+
+
+def test_analytic_times():
+    table = DriveTable.analytic()
+    assert (table.times[distances <= arrival_radius] == 0).all()
+    # Straight ahead further takes longer, to the side close targets can take longer since we turn slower
+    assert (np.diff(table.times[:, 0], axis=0) >= 0).all()
+    assert (table.times <= max_time).all()
+    # Boost gets us there sooner and turning around takes longer than driving straight
+    time, _ = table.lookup(3000, 0, 1000, 0)
+    assert table.lookup(3000, 0, 1000, 100)[0] < time < table.lookup(3000, np.pi, 1000, 0)[0]
+    # A lookup on a grid point gives the table
+    assert table.lookup(distances[10], 0, 0, 0)[0] == pytest.approx(table.times[10, 0, 0, 0])
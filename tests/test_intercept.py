@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('rlutilities.linear_algebra')
+
+from ball_prediction import BallPrediction, fps
+from intercept import Intercepts, reach_mask, drive_distance, refine_samples
+
+
+def rolling_ball(start, velocity, num_slices=360):
+    """Returns a ball prediction of a ball rolling from start with a constant velocity"""
+    t = np.arange(num_slices)[:, None] / fps
+    position = start + t * velocity
+    return BallPrediction.from_arrays(position, np.tile(velocity, (num_slices, 1)), np.zeros((num_slices, 3)),
+                                      100 + t[:, 0], 100.0)
+
+
+def cars(*positions, boost=0):
+    """Returns the arrays of cars resting at the positions facing along the x axis"""
+    count = len(positions)
+    return (np.array(positions, float), np.zeros((count, 3)), np.tile([1.0, 0, 0], (count, 1)),
+            np.full(count, boost, float))
+
+
+def test_drive_distance_boosting_is_faster():
+    t = np.linspace(0, 3, 31)
+    assert (np.diff(drive_distance(t, 0, 0)) > 0).all()
+    assert (drive_distance(t, 0, 100) >= drive_distance(t, 0, 0)).all()
+    assert drive_distance(0, 500, 100) == 0
+
+
+def test_reach_mask():
+    positions, velocities, forwards, boosts = cars([0, 0, 17], [5000, 0, 17])
+    targets = np.array([[100.0, 0, 93], [2000, 0, 93], [2000, 0, 93]])
+    times = np.array([0.0, 0.5, 3.0])
+    mask = reach_mask(positions, velocities, forwards, boosts, targets, times)
+    # A target within reach radius is reached right away, a far one only given enough time and turning around to it
+    # takes too long
+    np.testing.assert_array_equal(mask, [[True, False, True], [False, False, False]])
+
+
+def test_earliest_reachable_slice():
+    ball_prediction = rolling_ball(np.array([3000.0, 0, 93]), np.array([-500.0, 0, 0]))
+    positions, velocities, forwards, _ = cars([0, 0, 17], [0, 0, 17])
+    intercepts = Intercepts(positions, velocities, forwards, np.array([0.0, 100]), ball_prediction)
+    mask = intercepts.reachable
+    for index in range(2):
+        assert intercepts.found[index]
+        assert mask[index, intercepts.index[index]]
+        assert not mask[index, :intercepts.index[index]].any()
+        assert intercepts.time[index] == ball_prediction.time_until[intercepts.index[index]]
+    # Boost gets us there sooner
+    assert intercepts.time[1] < intercepts.time[0]
+
+
+def test_refined_time_is_between_the_slices():
+    ball_prediction = rolling_ball(np.array([3000.0, 0, 93]), np.array([-500.0, 0, 0]))
+    intercepts = Intercepts(*cars([0, 0, 17]), ball_prediction)
+    slice_index = intercepts.index[0]
+    refined = intercepts.refined_time(0)
+    previous = ball_prediction.time_until[slice_index - 1]
+    assert previous < refined <= intercepts.time[0]
+    assert np.isclose(np.linspace(previous, intercepts.time[0], refine_samples + 2), refined).any()
+
+
+def test_unreachable_ball_goes_for_the_last_slice():
+    ball_prediction = rolling_ball(np.array([-3000.0, 0, 1500]), np.array([-1000.0, 0, 0]), 60)
+    intercepts = Intercepts(*cars([0, 0, 17]), ball_prediction)
+    assert not intercepts.found[0]
+    assert intercepts.index[0] == ball_prediction.num_slices - 1
+
+
+def test_empty_prediction():
+    ball_prediction = BallPrediction.from_arrays(np.zeros((0, 3)), np.zeros((0, 3)), np.zeros((0, 3)), np.zeros(0), 0)
+    intercepts = Intercepts(*cars([0, 0, 17]), ball_prediction)
+    assert not intercepts.found.any()
@@ -0,0 +1,173 @@
+import numpy as np
+import pytest
+
+import jump_shot as jump_shot_module
+from contact import ball_radius
+from jump_shot import jump_shot, fps, max_duration
+
+# Hitbox of the octane, the half width and the offset from the center of mass
+octane_hitbox = np.array([59.0, 42.1, 18.1]), np.array([13.9, 0.0, 20.8])
+num_states = 200
+
+
+def yaw_orientation(yaw):
+    """Returns the orientation matrix of a car on the ground facing yaw, with the forward vector as its first column"""
+    return np.array([[np.cos(yaw), -np.sin(yaw), 0], [np.sin(yaw), np.cos(yaw), 0], [0, 0, 1]])
+
+
+def ballistic(start, velocity):
+    """Returns the locations of a ball flying from start with the velocity at 60 fps up to the max duration, it
+    stops falling at the ground"""
+    t = np.arange(round(fps * max_duration) + 1)[:, None] / fps
+    locations = start + t * velocity + 0.5 * t ** 2 * np.array([0, 0, -650])
+    locations[:, 2] = np.maximum(locations[:, 2], ball_radius)
+    return locations
+
+
+def random_states(seed=0):
+    """Returns car and ball states around a car on the ground, the balls are in jumping range ahead of where it drives"""
+    rng = np.random.default_rng(seed)
+    for _ in range(num_states):
+        orientation = yaw_orientation(rng.uniform(-np.pi, np.pi))
+        position = np.array([0, 0, 17.0])
+        speed = rng.uniform(0, 1500)
+        boost = rng.uniform(0, 100)
+        local = np.array([rng.uniform(100, 300) + speed * rng.uniform(0.2, 0.8), rng.uniform(-100, 100),
+                          rng.uniform(150, 400)])
+        ball_velocity = np.append(rng.uniform(-300, 300, 2), rng.uniform(0, 300))
+        yield position, orientation[:, 0] * speed, orientation, boost, ballistic(position + orientation @ local,
+                                                                                ball_velocity)
+
+
+def test_pruning_keeps_the_plan(monkeypatch):
+    """The reach check only skips slices the contact test rejects, so the plans are the same without it"""
+    states = list(random_states())
+    pruned = [jump_shot(*state, octane_hitbox) for state in states]
+    monkeypatch.setattr(jump_shot_module, 'reach_candidates', lambda *args: np.ones(len(args[6]), bool))
+    unpruned = [jump_shot(*state, octane_hitbox) for state in states]
+    assert sum(plan[0] for plan in unpruned) > num_states // 10
+    for (can_dodge, time, target), (expected_dodge, expected_time, expected_target) in zip(pruned, unpruned):
+        assert can_dodge == expected_dodge
+        if expected_dodge:
+            assert time == expected_time
+            np.testing.assert_array_equal(target, expected_target)
+
+
+def test_all_durations_match_the_default_search():
+    durations = np.arange(1, round(fps * max_duration) + 1) / fps
+    for state in random_states(1):
+        plan = jump_shot(*state, octane_hitbox)
+        limited = jump_shot(*state, octane_hitbox, durations)
+        assert plan[0] == limited[0]
+        assert plan[1] == limited[1]
+
+
+def test_ball_out_of_reach():
+    position, orientation = np.array([0, 0, 17.0]), np.eye(3)
+    far = ballistic(np.array([3000, 0, ball_radius]), np.zeros(3))
+    high = ballistic(np.array([0, 0, 1900]), np.zeros(3))
+    assert not jump_shot(position, np.zeros(3), orientation, 100, far, octane_hitbox)[0]
+    assert not jump_shot(position, np.zeros(3), orientation, 0, high, octane_hitbox)[0]
+    assert not jump_shot(position, np.zeros(3), orientation, 0, far[:1], octane_hitbox)[0]
+
+
+# The jump shot search replaced stepping a Dodge on a simulated car. These states have a clear outcome in both, the
+# search has to agree with the old simulation on whether the ball gets hit and about when
+regression_states = [
+    # A ball hanging in front of the car
+    (0, 0, 0, np.array([150, 0, 250]), np.zeros(3)),
+    # A ball dropping in front of the car while it drives towards it
+    (1000, 0, 50, np.array([700, 0, 300]), np.array([0, 0, 100])),
+    # A ball coming towards the car at jumping height
+    (0, np.pi / 2, 50, np.array([0, 600, 220]), np.array([0, -600, 200])),
+    # A ball too far away
+    (0, 0, 100, np.array([3000, 0, ball_radius]), np.zeros(3)),
+    # A ball too high without boost
+    (0, 0, 0, np.array([100, 0, 1500]), np.zeros(3)),
+]
+# Hitbox the old simulation used
+old_hitbox = np.array([64.4098892211914, 42.335182189941406, 14.697200775146484]), np.array([9.01, 0, 12.09])
+# Hit times of the old simulation and the search can differ by this many seconds
+regression_time_tolerance = 0.1
+
+
+def old_simulate(position, velocity, yaw, boost, ball_locations):
+    """The simulation of the baseline that steps a Dodge on a copy of the car at 30 fps for every duration and checks
+    the old hitbox against the ball after every step. The durations are every slice time instead of the ones around
+    the estimate of the analytic jump functions"""
+    from rlutilities.linear_algebra import vec3, vec2, dot, norm, clip, angle_between, look_at, euler_to_rotation
+    from rlutilities.mechanics import Dodge
+    from rlutilities.simulation import Car
+
+    def hit(car, ball_location):
+        half_width, offset = vec3(*old_hitbox[0]), vec3(*old_hitbox[1])
+        center = car.position + dot(car.orientation, offset)
+        b_local = dot(ball_location - center, car.orientation)
+        closest_local = vec3(min(max(b_local[0], -half_width[0]), half_width[0]),
+                             min(max(b_local[1], -half_width[1]), half_width[1]),
+                             min(max(b_local[2], -half_width[2]), half_width[2]))
+        hit_location = dot(car.orientation, closest_local) + center
+        if norm(hit_location - ball_location) > ball_radius:
+            return None
+        return abs(ball_location[2] - hit_location[2]) < 25
+
+    for i in range(1, round(fps * max_duration) + 1):
+        car = Car()
+        car.position = vec3(*position)
+        car.velocity = vec3(*velocity)
+        car.angular_velocity = vec3(0, 0, 0)
+        car.orientation = euler_to_rotation(vec3(0, yaw, 0))
+        car.boost = int(boost)
+        car.on_ground = True
+        car.time = 0
+        dodge = Dodge(car)
+        ball_location = vec3(*ball_locations[i])
+        dodge.duration = i / fps
+        dodge.target = ball_location
+        dodge.direction = vec2(ball_location) + vec2(ball_location - car.position)
+        dodge.preorientation = look_at(ball_location, vec3(0, 0, 1))
+        steps = 30
+        for j in range(round(steps * dodge.duration)):
+            ball_location = vec3(*ball_locations[round(fps * j / steps)])
+            dodge.step(1 / steps)
+            T = dodge.duration - dodge.timer
+            if T > 0:
+                if dodge.timer < 0.2:
+                    dodge.controls.boost = 1
+                    dodge.controls.pitch = 1
+                else:
+                    xf = car.position + 0.5 * T * T * vec3(0, 0, -650) + T * car.velocity
+                    delta_x = ball_location - xf
+                    if angle_between(vec2(car.forward()), dodge.direction) < 0.3:
+                        if norm(delta_x) > 50:
+                            dodge.controls.boost = 1
+                            dodge.controls.throttle = 0.0
+                        else:
+                            dodge.controls.boost = 0
+                            dodge.controls.throttle = clip(0.5 * (200 / 3) * T * T, 0.0, 1.0)
+                    else:
+                        dodge.controls.boost = 0
+                        dodge.controls.throttle = 0.0
+            else:
+                dodge.controls.boost = 0
+            car.step(dodge.controls, 1 / steps)
+            successful = hit(car, ball_location)
+            if successful is not None:
+                if successful:
+                    return True, j / steps
+                break
+    return False, None
+
+
+@pytest.mark.parametrize('speed, yaw, boost, ball_start, ball_velocity', regression_states)
+def test_matches_the_old_simulation(speed, yaw, boost, ball_start, ball_velocity):
+    pytest.importorskip('rlutilities.mechanics')
+    orientation = yaw_orientation(yaw)
+    position = np.array([0, 0, 17.01])
+    velocity = orientation[:, 0] * speed
+    ball_locations = ballistic(ball_start, ball_velocity)
+    can_dodge, time, _ = jump_shot(position, velocity, orientation, boost, ball_locations, old_hitbox)
+    expected_dodge, expected_time = old_simulate(position, velocity, yaw, boost, ball_locations)
+    assert can_dodge == expected_dodge
+    if expected_dodge:
+        assert abs(time - expected_time) <= regression_time_tolerance
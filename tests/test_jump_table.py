@@ -0,0 +1,43 @@
+import numpy as np
+
+from jump_sim import get_jump_trajectory, batmobile_resting_height, d
+from jump_table import JumpTable, heights, thetas, boosts
+
+# Height errors in uu the interpolated tables may have compared to the jump trajectory
+max_height_error = 25
+max_mean_height_error = 1
+samples = 2000
+
+
+def test_accuracy():
+    max_error, mean_error = JumpTable.generate().check_accuracy()
+    assert max_error < max_height_error
+    assert mean_error < max_mean_height_error
+
+
+def test_saved_table_loads(tmp_path):
+    path = tmp_path / 'jump_table.npz'
+    table = JumpTable.load(path)
+    assert path.exists()
+    loaded = JumpTable.load(path)
+    assert (loaded.times == table.times).all()
+    assert (loaded.times_no_boost == table.times_no_boost).all()
+
+
+def test_grid_agrees_with_the_jump_trajectory():
+    """At the grid points the tables give the time the jump of the jump shot search reaches the height"""
+    table = JumpTable.generate()
+    rng = np.random.default_rng(0)
+    i, j, k = (rng.integers(len(grid), size=samples) for grid in (heights, thetas, boosts))
+    height, theta, boost_amount = heights[i], thetas[j], boosts[k]
+    times = table.time_at_height_boost(height, theta, boost_amount)
+    np.testing.assert_allclose(times, table.times[i, j, k])
+    z, _ = get_jump_trajectory(times, d, theta, boost_amount)
+    reached = table.reaches(height, theta, boost_amount)
+    assert reached.sum() > samples // 10
+    # Within the time step of the tables the car rises less than 3uu, the car starts above the lowest heights
+    rising = reached & (height > batmobile_resting_height)
+    np.testing.assert_allclose(z[rising] + batmobile_resting_height, height[rising], atol=3)
+    # Heights the jump doesn't reach are above its apex
+    apex, _ = get_jump_trajectory(table.time_at_height_boost(heights[-1], theta, boost_amount), d, theta, boost_amount)
+    assert (height[~reached] >= apex[~reached] + batmobile_resting_height - 3).all()
@@ -0,0 +1,134 @@
+import math
+
+import numpy as np
+import pytest
+
+linear_algebra = pytest.importorskip('rlutilities.linear_algebra')
+
+import kernels
+
+vec2, vec3, dot, norm = linear_algebra.vec2, linear_algebra.vec3, linear_algebra.dot, linear_algebra.norm
+normalize, rotation = linear_algebra.normalize, linear_algebra.rotation
+num_states = 500
+# RLUtilities computes in single precision
+relative_tolerance = 1e-4
+absolute_tolerance = 0.1
+
+
+# The vec3 versions the kernels replaced, the agent is swapped for the vectors they read from it
+def cap(num, low, high):
+    return min(max(num, low), high)
+
+
+def sign(num):
+    return -1 if num <= 0 else 1
+
+
+def distance_2d(vec_a, vec_b):
+    return norm(vec2(vec_a - vec_b))
+
+
+def line_backline_intersect(y_axis, origin, direction):
+    if abs(direction[1]) < 1e-10:
+        direction[1] = 1e-10
+    mult = (y_axis - origin[1]) / direction[1]
+    return (origin + mult * direction)[0]
+
+
+def adjust_target(ball_target, ball_velocity, car_position, goal_to_ball, error, team):
+    goal_to_ball_2d = vec2(goal_to_ball[0], goal_to_ball[1])
+    test_vector_2d = dot(rotation(0.5 * math.pi), goal_to_ball_2d)
+    test_vector = vec3(test_vector_2d[0], test_vector_2d[1], 0)
+
+    distance = cap((40 + distance_2d(ball_target, car_position) * (error ** 2)) / 1.8, 0, 4000)
+    location = ball_target + vec3((goal_to_ball[0] * distance), goal_to_ball[1] * distance, 0)
+
+    multiplier = cap(distance_2d(car_position, location) / 1500, 0, 2)
+    distance_modifier = cap(dot(test_vector, ball_velocity) * multiplier, -1000, 1000)
+    location += vec3(test_vector[0] * distance_modifier, test_vector[1] * distance_modifier, 0)
+
+    extra = 3850 - abs(location[0])
+    if extra < 0:
+        location[0] = cap(location[0], -3850, 3850)
+        location[1] = location[1] + (-sign(team) * cap(extra, -800, 800))
+    return location
+
+
+def old_shooting_target(ball_position, ball_velocity, car_position, goal_center, corners, team):
+    ball_target = ball_position + 200 * normalize(vec3(vec2(goal_center - vec3(0, 5120, 0))))
+    car_to_ball = ball_target - car_position
+    backline_intersect = line_backline_intersect(goal_center[1], vec2(car_position), vec2(car_to_ball))
+    if abs(backline_intersect) < 700:
+        goal_to_ball = normalize(car_position - ball_target)
+        error = 0
+    else:
+        if -500 > backline_intersect:
+            target = corners[3] + vec3(400, 0, 0)
+        elif backline_intersect > 500:
+            target = corners[2] - vec3(400, 0, 0)
+        goal_to_ball = normalize(ball_target - target)
+        difference = goal_to_ball - normalize(car_position - target)
+        error = cap(abs(difference[0]) + abs(difference[1]), 0, 5)
+    return adjust_target(ball_target, ball_velocity, car_position, goal_to_ball, error, team)
+
+
+def old_defending_target(ball_position, ball_velocity, car_position, goal_center, team):
+    car_to_ball = ball_position - car_position
+    backline_intersect = line_backline_intersect(goal_center[1], vec2(car_position), vec2(car_to_ball))
+    target = goal_center + vec3(sign(backline_intersect) * max(abs(ball_position[0]), 1500), 0, 0)
+    target_to_ball = normalize(ball_position - target)
+    difference = target_to_ball - normalize(car_position - target)
+    error = cap(abs(difference[0]) + abs(difference[1]), 1, 10)
+    return adjust_target(ball_position, ball_velocity, car_position, target_to_ball, error, team)
+
+
+def goal_corners(center):
+    """Returns the corners of the goal like Goal does, the last two are at the top with the low x last"""
+    return [center + vec3(-892, 0, -320), center + vec3(892, 0, -320), center + vec3(892, 0, 320),
+            center + vec3(-892, 0, 320)]
+
+
+def random_states(seed=0):
+    """Returns ball and car states all over the field for both teams"""
+    rng = np.random.default_rng(seed)
+    for _ in range(num_states):
+        ball_position = rng.uniform([-4000, -5000, 93], [4000, 5000, 1500])
+        ball_velocity = rng.uniform(-2000, 2000, 3)
+        car_position = rng.uniform([-4000, -5000, 17], [4000, 5000, 17])
+        yield ball_position, ball_velocity, car_position, int(rng.integers(2))
+
+
+def to_vec3(array):
+    return vec3(float(array[0]), float(array[1]), float(array[2]))
+
+
+def to_array(vector):
+    return np.array([vector[0], vector[1], vector[2]])
+
+
+def test_shooting_target_matches_the_vec3_version():
+    for ball_position, ball_velocity, car_position, team in random_states():
+        their_goal = np.array([0, 5120.0 if team == 0 else -5120.0, 320])
+        corners = goal_corners(to_vec3(their_goal))
+        expected = old_shooting_target(to_vec3(ball_position), to_vec3(ball_velocity), to_vec3(car_position),
+                                       to_vec3(their_goal), corners, team)
+        target = kernels.shooting_target(ball_position, ball_velocity, car_position, their_goal,
+                                         to_array(corners[3]), to_array(corners[2]), float(sign(team)))
+        np.testing.assert_allclose(target, to_array(expected), rtol=relative_tolerance, atol=absolute_tolerance)
+
+
+def test_defending_target_matches_the_vec3_version():
+    for ball_position, ball_velocity, car_position, team in random_states(1):
+        my_goal = np.array([0, -5120.0 if team == 0 else 5120.0, 320])
+        expected = old_defending_target(to_vec3(ball_position), to_vec3(ball_velocity), to_vec3(car_position),
+                                        to_vec3(my_goal), team)
+        target = kernels.defending_target(ball_position, ball_velocity, car_position, my_goal, float(sign(team)))
+        np.testing.assert_allclose(target, to_array(expected), rtol=relative_tolerance, atol=absolute_tolerance)
+
+
+def test_backline_intersect_matches_the_vec3_version():
+    for ball_position, _, car_position, _ in random_states(2):
+        direction = ball_position - car_position
+        expected = line_backline_intersect(5120, vec2(to_vec3(car_position)), vec2(to_vec3(direction)))
+        intersect = kernels.backline_intersect(5120.0, car_position[0], car_position[1], direction[0], direction[1])
+        assert intersect == pytest.approx(expected, rel=relative_tolerance, abs=absolute_tolerance)
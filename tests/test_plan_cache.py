@@ -0,0 +1,57 @@
+import numpy as np
+
+from jump_shot import jump_shot, fps
+from plan_cache import PlanCache
+
+hitbox = np.array([59.0, 42.1, 18.1]), np.array([13.9, 0.0, 20.8])
+
+
+def hit_state(ticks=0):
+    """Returns a car driving at a ball that drops in front of it, ticks later. The search finds a hit for it"""
+    t = np.arange(ticks, ticks + 85)[:, None] / fps
+    velocity = np.array([1000.0, 0, 0])
+    ball_locations = np.array([700, 0, 300]) + t * np.array([0, 0, 100]) + 0.5 * t ** 2 * np.array([0, 0, -650])
+    return np.array([0, 0, 17.0]) + t[0] * velocity, velocity, np.eye(3), 50, ball_locations, hitbox
+
+
+def miss_state(ticks=0):
+    """Returns a car resting far away from a ball on the ground, ticks later"""
+    ball_locations = np.tile([3000.0, 0, 93.15], (85, 1))
+    return np.array([0, 0, 17.0]), np.zeros(3), np.eye(3), 50, ball_locations, hitbox
+
+
+def test_plan_without_hit_is_reused():
+    cache = PlanCache()
+    plan = cache.search(*miss_state(), 0, None)
+    assert not plan[0]
+    assert cache.search(*miss_state(1), 1 / fps, None) is plan
+    assert cache.outcomes == {'miss': 1, 'hit': 1}
+
+
+def test_plan_with_hit_is_revalidated():
+    cache = PlanCache()
+    plan = cache.search(*hit_state(), 0, None)
+    assert plan[0]
+    revalidated = cache.search(*hit_state(1), 1 / fps, None)
+    assert cache.outcomes['revalidated'] == 1
+    expected = jump_shot(*hit_state(1))
+    assert revalidated[0] == expected[0]
+    assert revalidated[1] == expected[1]
+    np.testing.assert_array_equal(revalidated[2], expected[2])
+
+
+def test_touch_invalidates_the_plan():
+    cache = PlanCache()
+    cache.search(*miss_state(), 0, None)
+    cache.search(*miss_state(), 1 / fps, 'touched')
+    assert cache.invalidations == {'touch': 1}
+    assert cache.outcomes == {'miss': 2}
+
+
+def test_state_jump_invalidates_the_plan():
+    cache = PlanCache()
+    cache.search(*hit_state(), 0, None)
+    position, *rest = hit_state(1)
+    cache.search(position + np.array([0, 500, 0]), *rest, 1 / fps, None)
+    assert cache.invalidations == {'car jump': 1}
+    assert cache.hit_rate == 0
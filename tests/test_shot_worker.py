@@ -0,0 +1,72 @@
+import threading
+
+import numpy as np
+
+from shot_worker import ShotWorker
+
+state = np.zeros(3), np.zeros(3), np.eye(3), 50, np.zeros((2, 3))
+
+
+def finish(worker):
+    """Waits for the current search of the worker"""
+    worker.future.exception()
+
+
+def test_finished_plan_is_tagged_with_its_staleness():
+    target = np.array([1.0, 2.0, 3.0])
+    worker = ShotWorker(search=lambda *args: (True, 0.5, target))
+    worker.submit(10.0, *state)
+    finish(worker)
+    plan = worker.plan(10.02)
+    assert plan.can_dodge and plan.duration == 0.5 and plan.target is target
+    assert plan.time == 10.0
+    assert np.isclose(plan.staleness, 0.02)
+    assert worker.plan(10.2) is None
+    worker.shutdown()
+
+
+def test_running_search_is_kept_until_the_deadline():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def search(*args):
+        calls.append(args)
+        started.set()
+        release.wait()
+        return False, None, None
+
+    worker = ShotWorker(search=search)
+    worker.submit(10.0, *state)
+    started.wait()
+    worker.submit(10.01, *state)
+    assert len(calls) == 1
+    # The result of a search that got replaced is dropped
+    worker.submit(10.1, *state)
+    release.set()
+    finish(worker)
+    assert len(calls) == 2
+    assert worker.plan(10.1).time == 10.1
+    worker.shutdown()
+
+
+def test_extra_arguments_are_passed_to_the_search():
+    worker = ShotWorker(search=lambda *args: (False, None, args[-1]))
+    worker.submit(10.0, *state, 'hitbox')
+    finish(worker)
+    assert worker.plan(10.0).target == 'hitbox'
+    worker.shutdown()
+
+
+def test_failed_search_is_logged_and_counted(caplog):
+    def search(*args):
+        raise ValueError('broken search')
+
+    worker = ShotWorker(search=search)
+    for tick in range(3):
+        worker.submit(10.0 + tick * 0.1, *state)
+        finish(worker)
+        assert worker.plan(10.0 + tick * 0.1) is None
+    assert worker.errors == 3
+    assert [record.exc_info[1].args[0] for record in caplog.records] == ['broken search']
+    worker.shutdown()